@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+Benchmarks of `widget.plotter` on synthetic data like in `widget.main`.
+
+Every case runs headless (Agg backend) in its own process, so that the peak
+memory of one case is not affected by the others. The results are printed
+and can be written to a JSON file for comparison between versions:
+
+    python benchmarks/benchmark.py --nx 400 --ny 400 --nt 100 --output results.json
+    python benchmarks/benchmark.py --compare old.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+CASES = ['1D', '2D', 'y_of_t', 'overlays']
+
+
+def make_data(case, nx, ny, nt, overlays):
+    """
+    Returns the positional and keyword arguments of `plotter` for the case,
+    using the same functions as the example in `widget.main`.
+    """
+    x = np.linspace(1.0, 10.0, nx)
+    y = np.linspace(1.0, 10.0, ny)
+    times = np.linspace(1.0, 11.0, nt)
+    if case in ['1D', 'overlays']:
+        data = np.array([t * np.sin(x * np.pi * 3) + 6 for t in times])
+        kwargs = {'times': times}
+        if case == 'overlays':
+            kwargs['data2'] = [(0.5 + 0.5 * k / overlays) * data for k in range(overlays)]
+            kwargs['data3'] = [times * (0.5 + 0.5 * k / overlays) for k in range(overlays)]
+        return (x, data), kwargs
+    X, Y = np.meshgrid(x, y)
+    data = np.zeros([ny * nt, nx])
+    for it in range(nt):
+        data[it * ny:(it + 1) * ny, :] = (X + Y) * \
+            np.exp(-6.0 * ((X - times[it])**2 + (Y - times[it])**2))
+    if case == '2D':
+        return (x, data), {'y': y, 'times': times, 'colbar': True}
+    #
+    # time dependent y: the grid is stretched over time
+    #
+    Y_t = np.vstack([Y * (1.0 + 0.5 * it / nt) for it in range(nt)])
+    return (X, data), {'y': Y_t, 'times': times, 'colbar': True}
+
+
+def percentiles(values):
+    "summary of a list of timings in milliseconds"
+    values = 1e3 * np.asarray(values)
+    return {'n': len(values), 'mean': float(values.mean()),
+            'p50': float(np.percentile(values, 50)), 'p90': float(np.percentile(values, 90)),
+            'p99': float(np.percentile(values, 99)), 'max': float(values.max())}
+
+
+def peak_rss_mb():
+    "peak resident memory of this process in MB"
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10
+
+
+def run_case(case, args):
+    """
+    Runs one benchmark case in this process and returns the results.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from widget import plotter
+
+    (x, data), kwargs = make_data(case, args.nx, args.ny, args.nt, args.overlays)
+    if 'y' in kwargs:
+        kwargs['mode'] = args.mode
+    result = {'case': case, 'data_mb': data.nbytes / 2**20}
+    #
+    # construction, including the first draw of the figure
+    #
+    t0 = time.perf_counter()
+    p = plotter(x, data, **kwargs)
+    fig = plt.gcf()
+    fig.canvas.draw()
+    result['construct_ms'] = 1e3 * (time.perf_counter() - t0)
+    #
+    # slider updates, stepping through the snapshots like a drag
+    #
+    timings = []
+    for k in range(1, args.updates + 1):
+        t0 = time.perf_counter()
+        p.slider.set_val(k % p.nt)
+        timings += [time.perf_counter() - t0]
+    result['update_ms'] = percentiles(timings)
+    result['stages'] = p.timings.summary()
+    #
+    # saving single snapshots like the plot button does
+    #
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ['png', 'pdf']:
+            timings = []
+            for k in range(args.repeat):
+                t0 = time.perf_counter()
+                p.render([k % p.nt], fmt=fmt, out=os.path.join(tmp, 'snapshot_{:04d}'))
+                timings += [time.perf_counter() - t0]
+            result['save_%s_ms' % fmt] = percentiles(timings)
+        #
+        # movie export
+        #
+        result['movie_fps'] = None
+        if shutil.which('ffmpeg') is not None:
+            n_frames = min(p.nt, args.frames)
+            t0 = time.perf_counter()
+            p.export_movie(os.path.join(tmp, 'movie.mp4'), start=0, stop=n_frames, progress=False)
+            result['movie_fps'] = n_frames / (time.perf_counter() - t0)
+    plt.close('all')
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def compare(old_file, new_file):
+    "print the relative change of the main numbers between two result files"
+    with open(old_file) as f:
+        old = {r['case']: r for r in json.load(f)['results']}
+    with open(new_file) as f:
+        new = {r['case']: r for r in json.load(f)['results']}
+    keys = [('construct_ms', None), ('update_ms', 'p50'), ('update_ms', 'p90'),
+            ('save_png_ms', 'p50'), ('save_pdf_ms', 'p50'), ('movie_fps', None), ('peak_rss_mb', None)]
+    for case in new:
+        if case not in old:
+            continue
+        print(case)
+        for key, sub in keys:
+            a, b = old[case].get(key), new[case].get(key)
+            if sub is not None and a is not None and b is not None:
+                a, b = a[sub], b[sub]
+            if a is None or b is None:
+                continue
+            name = key if sub is None else key + '.' + sub
+            print('  {:<18s} {:10.2f} -> {:10.2f} ({:+.0%})'.format(name, a, b, b / a - 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES, help='cases to run')
+    parser.add_argument('--nx', type=int, default=200, help='number of x points')
+    parser.add_argument('--ny', type=int, default=200, help='number of y points of 2D data')
+    parser.add_argument('--nt', type=int, default=100, help='number of snapshots')
+    parser.add_argument('--overlays', type=int, default=20, help='number of data2 and data3 lines')
+    parser.add_argument('--mode', default='contour', help='mode of the 2D plots')
+    parser.add_argument('--updates', type=int, default=50, help='number of slider updates')
+    parser.add_argument('--repeat', type=int, default=3, help='number of saved figures per format')
+    parser.add_argument('--frames', type=int, default=50, help='maximum number of movie frames')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.case:
+        #
+        # child process: run one case and report it on stdout
+        #
+        print(json.dumps(run_case(args.case, args)))
+        return
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get('PYTHONPATH', '')]))
+    results = []
+    for case in args.cases:
+        cmd = [sys.executable, os.path.abspath(__file__), '--case', case] + sys.argv[1:]
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, env=env, check=True).stdout
+        result = json.loads(out.decode().strip().splitlines()[-1])
+        results += [result]
+        print('{case:<9s} construct {construct_ms:8.1f} ms | update p50 {p50:7.1f} ms p90 {p90:7.1f} ms | '
+              'png {png:7.1f} ms pdf {pdf:7.1f} ms | movie {fps} | rss {peak_rss_mb:7.1f} MB'.format(
+                  p50=result['update_ms']['p50'], p90=result['update_ms']['p90'],
+                  png=result['save_png_ms']['p50'], pdf=result['save_pdf_ms']['p50'],
+                  fps='n/a' if result['movie_fps'] is None else '%.1f frames/s' % result['movie_fps'],
+                  **result))
+
+    if args.output:
+        import matplotlib
+        info = {'python': platform.python_version(), 'numpy': np.__version__,
+                'matplotlib': matplotlib.__version__, 'machine': platform.machine(),
+                'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+        try:
+            info['commit'] = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                                     stderr=subprocess.DEVNULL).decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            pass
+        with open(args.output, 'w') as f:
+            json.dump({'info': info, 'settings': {k: v for k, v in vars(args).items() if k not in ['output', 'compare', 'case']},
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Regression check of the blitted slider updates.
+
+A snapshot drawn by blitting the changed artists on top of the cached
+background has to look like the same snapshot after a full redraw of the
+figure, including the time in the axes title. The check runs on the Agg
+backend, which supports blitting, so it can run in CI:
+
+    python benchmarks/blit_check.py
+"""
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from widget import plotter  # noqa: E402
+
+
+def cases():
+    "the plotters to check, 1D and 2D data with a time in the title"
+    x = np.linspace(1.0, 10.0, 60)
+    y = np.linspace(1.0, 10.0, 40)
+    times = np.linspace(1.0, 11.0, 8)
+    data_1D = np.array([t * np.sin(x * np.pi * 3) + 6 for t in times])
+    data_2D = np.array([t * np.outer(np.cos(y), np.sin(x)) + 6 for t in times])
+    yield '1D', plotter(x, data_1D, times=times, data2=[0.5 * data_1D], data3=[times])
+    yield '2D contour', plotter(x, data_2D, y=y, times=times, zlim=[0, 20])
+    yield '2D image', plotter(x, data_2D, y=y, times=times, zlim=[0, 20], mode='image')
+
+
+def main():
+    failed = False
+    for name, p in cases():
+        canvas = p.slider.ax.figure.canvas
+        canvas.draw()
+        for i in [3, 5]:
+            p.slider.set_val(i)
+            blitted = np.array(canvas.buffer_rgba())
+            canvas.draw()
+            full = np.array(canvas.buffer_rgba())
+            n_diff = np.any(blitted != full, axis=-1).sum()
+            print('{:12s} snapshot {}: {} differing pixels'.format(name, i, n_diff))
+            if n_diff > 0:
+                print('FAILED: the blitted update of {} differs from a full redraw'.format(name))
+                failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Regression check of the import cost of `widget`.
+
+Importing the package must not load matplotlib, and building a plotter
+without GUI must not load pyplot (and with it the GUI backend) or the
+axes_grid1 toolkit. The import time is measured in fresh interpreters and
+compared to a limit, so the check can run in CI:
+
+    python benchmarks/import_time.py --max-ms 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+#
+# each check runs in a fresh interpreter and prints the loaded modules
+#
+IMPORT = """
+import sys, time
+t0 = time.perf_counter()
+import widget
+dt = time.perf_counter() - t0
+print(json.dumps({'ms': 1e3 * dt, 'modules': list(sys.modules)}))
+"""
+
+HEADLESS = """
+import sys
+import numpy as np
+from widget import plotter
+x = np.linspace(0, 1, 10)
+p = plotter(x, np.array([x * t for t in range(3)]), gui=False)
+p._renderer()(1)
+print(json.dumps({'modules': list(sys.modules)}))
+"""
+
+FORBIDDEN = {
+    IMPORT: ['matplotlib', 'matplotlib.pyplot', 'mpl_toolkits.axes_grid1'],
+    HEADLESS: ['matplotlib.pyplot', 'mpl_toolkits.axes_grid1'],
+}
+
+
+def run(code, env):
+    out = subprocess.run([sys.executable, '-c', 'import json\n' + code], stdout=subprocess.PIPE,
+                         env=env, check=True).stdout
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='number of measured imports')
+    parser.add_argument('--max-ms', type=float, default=50.0, help='maximum median import time in ms')
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get('PYTHONPATH', '')]))
+    env.pop('MPLBACKEND', None)
+
+    failed = False
+    for code, forbidden in FORBIDDEN.items():
+        loaded = set(run(code, env)['modules'])
+        for name in forbidden:
+            if name in loaded:
+                print('FAILED: {} is imported by\n{}'.format(name, code))
+                failed = True
+
+    ms = np.median([run(IMPORT, env)['ms'] for _ in range(args.repeat)])
+    print('import widget: {:.1f} ms (limit {:.1f} ms)'.format(ms, args.max_ms))
+    if ms > args.max_ms:
+        print('FAILED: importing widget is too slow')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -19,5 +19,6 @@ setup(
     install_requires=[
         'scipy',
         'numpy',
-        'matplotlib'],
+        'matplotlib',
+        'contourpy'],
     zip_safe=False)
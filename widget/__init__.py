@@ -1,3 +1,31 @@
-from .widget import plotter
+"""
+Interactive plotting of time dependent 1D and 2D data.
 
-__all__ = ['plotter']
+The classes are imported when they are first used, so that importing the
+package does not load matplotlib. pyplot and the GUI backend are only loaded
+when a plotter with a GUI is built.
+"""
+import importlib
+
+__all__ = ['plotter', 'dashboard', 'FileSource', 'TransformedData']
+
+_modules = {'plotter': '.widget', 'dashboard': '.dashboard', 'FileSource': '.source',
+            'TransformedData': '.transform'}
+
+_submodules = ['blit', 'cache', 'contours', 'dashboard', 'data', 'framecache', 'lod', 'movie',
+               'overlays', 'parallel', 'player', 'schedule', 'server', 'source', 'stats', 'timing',
+               'transform', 'widget']
+
+
+def __getattr__(name):
+    if name in _modules:
+        value = getattr(importlib.import_module(_modules[name], __name__), name)
+        globals()[name] = value
+        return value
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(list(globals()) + __all__ + _submodules))
@@ -0,0 +1,6 @@
+"""
+Shows the examples of `widget.widget.main`: python -m widget
+"""
+from .widget import main
+
+main()
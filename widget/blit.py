@@ -0,0 +1,103 @@
+"""
+Blitting support: redraw only the artists that change between snapshots on
+top of a cached copy of the rest of the figure.
+"""
+from matplotlib.axis import Axis
+
+
+def draws_inside(artist):
+    """
+    False for an axis whose ticks point outwards and that has no grid lines,
+    it then does not overlap the data and is kept in the background
+    """
+    if not isinstance(artist, Axis):
+        return True
+    return any(t.gridline.get_visible() or t.get_tickdir() != 'out'
+               for t in artist.majorTicks + artist.minorTicks)
+
+
+class BlitManager:
+    """
+    Keeps a copy of the figure without the dynamic artists and redraws only
+    those on top of it.
+
+    The background is taken lazily: any full draw of the canvas (the initial
+    one, a resize, changing the axis scales, ...) invalidates it and the next
+    call to `update` renders it once more with the dynamic artists left out.
+    They are only marked as animated while the background is rendered, so
+    that the layout still places them (e.g. the axes title) and saving the
+    figure includes them.
+
+    Arguments:
+    canvas : FigureCanvas
+        the canvas to draw on
+
+    Keywords:
+    artists : list
+        the artists that change from one update to the next
+    """
+
+    def __init__(self, canvas, artists=[]):
+        self.canvas = canvas
+        self.artists = list(artists)
+        self._background = None
+        self._capturing = False
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        if not self._capturing:
+            self._background = None
+
+    def replace(self, old, new):
+        "replace a dynamic artist, e.g. if a new contour set was created"
+        self.artists[self.artists.index(old)] = new
+
+    def _capture(self):
+        "render and store the figure without the dynamic artists"
+        #
+        # hidden artists would be left out of the layout as well, animated
+        # ones are only not drawn
+        #
+        stack = self._stack()
+        animated = [a.get_animated() for a in stack]
+        for a in stack:
+            a.set_animated(True)
+        self._capturing = True
+        try:
+            self.canvas.draw()
+        finally:
+            self._capturing = False
+            for a, v in zip(stack, animated):
+                a.set_animated(v)
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+
+    def _stack(self):
+        """
+        the dynamic artists in the order of a full draw, with the static
+        artists of their axes that are drawn on top of them (like spines and
+        legend)
+        """
+        stack = []
+        dynamic = set(id(a) for a in self.artists)
+        for ax in self.canvas.figure.axes:
+            children = [a for a in ax.get_children() if a is not ax.patch]
+            order = sorted(range(len(children)), key=lambda k: children[k].get_zorder())
+            children = [children[k] for k in order]
+            first = [k for k, a in enumerate(children) if id(a) in dynamic]
+            if len(first) > 0:
+                stack += [a for a in children[first[0]:]
+                          if id(a) in dynamic or (a.get_visible() and draws_inside(a))]
+        in_axes = set(id(a) for a in stack)
+        return stack + [a for a in self.artists if id(a) not in in_axes]
+
+    def update(self):
+        "restore the background, draw the dynamic artists and blit the result"
+        fig = self.canvas.figure
+        if self._background is None:
+            self._capture()
+        else:
+            self.canvas.restore_region(self._background)
+        for a in self._stack():
+            fig.draw_artist(a)
+        self.canvas.blit(fig.bbox)
+        self.canvas.flush_events()
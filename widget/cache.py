@@ -0,0 +1,69 @@
+"""
+Small, thread-safe caches used to keep the interactive updates responsive.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+
+def reset_after_fork(method):
+    """
+    Call the bound `method` in a child process after a fork, without keeping
+    its object alive. Used to replace locks that may have been held by another
+    thread at the time of the fork.
+    """
+    if hasattr(os, 'register_at_fork'):
+        ref = weakref.WeakMethod(method)
+        os.register_at_fork(after_in_child=lambda: ref() is not None and ref()())
+
+
+class LRUCache:
+    """
+    Dictionary-like cache holding at most `maxsize` items. When full, the
+    least recently used item is discarded. All methods are thread-safe, so
+    the cache can be filled by a background worker while the GUI reads it.
+
+    Arguments:
+    maxsize : int
+        maximum number of stored items
+    """
+
+    def __init__(self, maxsize=32):
+        if maxsize < 1:
+            raise ValueError('ERROR: maxsize needs to be at least 1')
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        reset_after_fork(self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def get(self, key, default=None):
+        "return the cached value (marking it as recently used) or `default`"
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        "store `value`, discarding the least recently used item if needed"
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        "remove all items"
+        with self._lock:
+            self._items.clear()
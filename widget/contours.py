@@ -0,0 +1,148 @@
+"""
+Precomputation of filled contour geometry.
+
+`matplotlib` can only create the contour artists in the GUI thread, but the
+expensive part of `contourf` is finding the polygons. These are computed here
+with `contourpy` (the library `matplotlib` uses internally) so that they can be
+cached and filled in from a background thread.
+"""
+import threading
+
+import numpy as np
+import contourpy
+
+from .cache import reset_after_fork
+
+
+def contour_geometry(x, y, z, levels, logscale=False, corner_mask=None, algorithm=None):
+    """
+    Compute the filled contour polygons of `z` between the given levels in the
+    same way as `contourf` does.
+
+    Arguments:
+    x, y : array
+        1D or 2D coordinate arrays as accepted by `contourf`
+    z : array
+        2D array of shape (ny, nx)
+    levels : array
+        contour levels
+
+    Keywords:
+    logscale : bool
+        whether the levels are used with a logarithmic norm
+    corner_mask, algorithm :
+        same meaning as for `contourf`
+
+    Returns:
+    allsegs, allkinds : lists
+        polygon vertices and path codes for each of the len(levels)-1 layers,
+        to be passed to `matplotlib.contour.ContourSet`
+    """
+    z = np.ma.masked_invalid(z, copy=False)
+    if logscale:
+        z = np.ma.masked_where(z <= 0, z)
+    if algorithm is None:
+        algorithm = 'mpl2014'
+    if corner_mask is None:
+        corner_mask = algorithm != 'mpl2005'
+    generator = contourpy.contour_generator(
+        np.asarray(x, dtype=float), np.asarray(y, dtype=float), z,
+        name=algorithm, corner_mask=corner_mask,
+        fill_type=contourpy.FillType.OuterCode)
+    #
+    # include the minimum value in the lowest interval, like contourf does
+    #
+    lowers = np.array(levels[:-1], dtype=float)
+    uppers = np.array(levels[1:], dtype=float)
+    if z.min() == lowers[0]:
+        if logscale:
+            lowers[0] = 0.99 * lowers[0]
+        else:
+            lowers[0] -= 1
+    allsegs = []
+    allkinds = []
+    for lower, upper in zip(lowers, uppers):
+        segs, kinds = generator.filled(lower, upper)
+        allsegs += [segs]
+        allkinds += [kinds]
+    return allsegs, allkinds
+
+
+class ContourPrefetcher:
+    """
+    Background thread that fills a cache with the result of `compute(i)` for
+    the indices around the one that was requested last, alternating ahead of
+    and behind it.
+
+    Arguments:
+    compute : callable
+        function returning the cached value for a snapshot index
+    cache : LRUCache
+        cache to be filled, keyed by snapshot index
+    n : int
+        number of snapshots
+
+    Keywords:
+    radius : int
+        number of snapshots to compute on each side of the requested one,
+        limited such that the prefetched range fits into the cache
+    valid : callable
+        if given, cached values for which valid(value) is false (e.g.
+        computed for another level of detail) are computed again
+    """
+
+    def __init__(self, compute, cache, n, radius=5, valid=None):
+        self.compute = compute
+        self.cache = cache
+        self.valid = valid
+        self.n = n
+        self.radius = max(0, min(radius, (cache.maxsize - 1) // 2))
+        self._center = None
+        self._running = True
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        reset_after_fork(self._after_fork)
+
+    def _after_fork(self):
+        "the worker thread does not exist in a forked child"
+        self._condition = threading.Condition()
+        self._running = False
+
+    def request(self, i):
+        "make `i` the center of the prefetched range"
+        with self._condition:
+            self._center = i
+            self._condition.notify()
+
+    def stop(self):
+        "stop the worker thread"
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def _next_index(self, center):
+        "return the closest index around `center` that is not cached yet or outdated"
+        for offset in range(self.radius + 1):
+            for i in (center + offset, center - offset):
+                if 0 <= i < self.n:
+                    cached = self.cache.get(i)
+                    if cached is None or (self.valid is not None and not self.valid(cached)):
+                        return i
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and (self._center is None or
+                                         self._next_index(self._center) is None):
+                    self._condition.wait()
+                if not self._running:
+                    return
+                i = self._next_index(self._center)
+            try:
+                self.cache.put(i, self.compute(i))
+            except Exception as err:
+                print('WARNING: precomputing snapshot %i failed: %s' % (i, err))
+                with self._condition:
+                    self._center = None
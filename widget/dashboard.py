@@ -0,0 +1,76 @@
+"""
+Several plotters shown in one figure with a single time slider.
+"""
+import numpy as np
+
+from .schedule import UpdateScheduler
+
+
+class dashboard:
+    def __init__(self, panels, ncols=None, i_start=0, bg_color='w', bg_color_ax='none', figsize=None,
+                 max_fps=None):
+        """
+        shows the snapshots of several plotters side by side in one figure,
+        all controlled by the same time slider. Moving the slider updates the
+        artists of all panels and then redraws the figure once, instead of
+        each linked figure drawing itself in turn as with `ext_link`.
+
+        Arguments:
+        panels = list of `plotter` objects, created with gui=False
+
+        Keywords:
+        ncols       = number of panels per row, defaults to all in one row
+        i_start     = index of the initial snapshot
+        bg_color    = background color of the figure
+        bg_color_ax = background color of the panels
+        figsize     = size of the figure in inches, by default 5 x 4 per panel
+        max_fps     = if given, update the display at most this many times per
+                      second while the slider is dragged
+
+        Example:
+        >>> p1 = plotter(x, data1D, times=times, gui=False)
+        >>> p2 = plotter(x, data2D, y=y, times=times, colbar=True, gui=False)
+        >>> d = dashboard([p1, p2])
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Slider
+
+        if len(panels) == 0:
+            raise ValueError('ERROR: need at least one panel')
+        ncols = ncols or len(panels)
+        nrows = int(np.ceil(len(panels) / ncols))
+        if figsize is None:
+            figsize = (5 * ncols, 4 * nrows + 1)
+        self.panels = panels
+        self.nt = min(p.nt for p in panels)
+        i_start = min(i_start, self.nt - 1)
+        #
+        # draw all panels
+        #
+        fig = plt.figure(facecolor=bg_color, figsize=figsize)
+        fig.subplots_adjust(bottom=0.15 + 0.05 / nrows, wspace=0.4, hspace=0.4)
+        axes = [fig.add_subplot(nrows, ncols, k + 1, facecolor=bg_color_ax) for k in range(len(panels))]
+        set_index = [p._draw_panel(a, i_start) for p, a in zip(panels, axes)]
+        self.fig = fig
+        self.axes = axes
+        #
+        # make time slider
+        #
+        axcolor = 'lightgoldenrodyellow'
+        ax_time = fig.add_axes([0.25, 0.03, 0.5, 0.03], facecolor=axcolor)
+        slider_time = Slider(ax_time, 'time', 0.0, self.nt - 1,
+                             valinit=i_start, valfmt='%i')
+        self.slider = slider_time
+        ax_time._widgets = [slider_time]  # avoids garbage collection
+
+        def show(i):
+            if i == shown[0]:
+                return
+            shown[0] = i
+            for f in set_index:
+                f(i)
+            fig.canvas.draw_idle()
+        shown = [i_start]
+        scheduler = UpdateScheduler(fig.canvas, show, max_fps=max_fps)
+        fig.canvas.mpl_connect('close_event', lambda event: scheduler.stop())
+        slider_time.on_changed(lambda val: scheduler.request(int(np.floor(slider_time.val))))
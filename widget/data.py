@@ -0,0 +1,177 @@
+"""
+Helpers to work with the snapshot data without holding all of it in memory.
+
+The data can be a numpy array, a `np.memmap` or any other array-like object
+(e.g. an h5py dataset) that has a `shape` and supports slicing of rows.
+"""
+import numpy as np
+
+
+def data_range(data, chunk=2**22):
+    """
+    Returns [min, max] of `data`, reading it in blocks of rows such that only
+    about `chunk` elements are in memory at a time.
+
+    Arguments:
+    data : array-like
+        array, memmap or other object supporting `shape` and row slicing
+
+    Keywords:
+    chunk : int
+        approximate number of elements read at a time
+    """
+    shape = np.shape(data)
+    if len(shape) == 0:
+        return [data, data]
+    rows = max(1, chunk // max(1, int(np.prod(shape[1:]))))
+    d_min = None
+    d_max = None
+    for i0 in range(0, shape[0], rows):
+        block = np.asarray(data[i0:i0 + rows])
+        if d_min is None:
+            d_min, d_max = block.min(), block.max()
+        else:
+            d_min, d_max = min(d_min, block.min()), max(d_max, block.max())
+    return [d_min, d_max]
+
+
+def time_series(data, index, rows=None):
+    """
+    Returns the values at `index` of all snapshots, e.g. the time series of
+    one cell. For arrays and memmaps this is a strided read of only these
+    values, other objects can provide it with a method `time_series(index)`.
+
+    Arguments:
+    data : array-like
+        data of shape (nt, ...) or (nt*rows, nx)
+    index : tuple of int
+        index within a snapshot, (ix,) for 1D and (iy, ix) for 2D snapshots
+
+    Keywords:
+    rows : int
+        number of rows per snapshot if data has the shape (nt*rows, nx)
+    """
+    index = tuple(int(i) for i in index)
+    if hasattr(data, 'time_series'):
+        return np.asarray(data.time_series(index))
+    if rows is None:
+        return np.array(data[(slice(None),) + index])
+    return np.array(data[index[0]::rows, index[1]])
+
+
+class SnapshotSeries:
+    """
+    Sequence of snapshots that can be extended with `append`, used to watch
+    data that is still being produced. The snapshots of `base` are not
+    copied, appended ones are stored in a preallocated array that grows as
+    needed. If `maxlen` is given, only the last maxlen snapshots are kept in
+    a ring buffer of that size, so that the memory stays bounded.
+
+    Arguments:
+    base : array-like
+        the initial snapshots, of shape (nt, ...) or (nt*rows, nx)
+
+    Keywords:
+    rows : int
+        number of rows per snapshot if base has the shape (nt*rows, nx)
+    maxlen : int
+        maximum number of snapshots that are kept
+    """
+
+    def __init__(self, base, rows=None, maxlen=None):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError('ERROR: maxlen needs to be at least 1')
+        self.rows = rows
+        self.maxlen = maxlen
+        self._base = base
+        self._n_base = np.shape(base)[0] // (rows or 1)
+        self._dtype = getattr(base, 'dtype', None)
+        self._buffer = None
+        self._start = 0
+        self._n = 0
+        if maxlen is not None:
+            for i in range(max(0, self._n_base - maxlen), self._n_base):
+                self.append(self._base_item(i))
+            self._base = None
+            self._n_base = 0
+
+    def _base_item(self, i):
+        if self.rows is None:
+            return self._base[i]
+        return self._base[i * self.rows:(i + 1) * self.rows]
+
+    def __len__(self):
+        return self._n_base + self._n
+
+    def time_series(self, index):
+        "returns the values at `index` of all snapshots, see `time_series`"
+        values = [time_series(self._base, index, rows=self.rows)] if self._n_base > 0 else []
+        if self._n > 0:
+            order = (self._start + np.arange(self._n)) % len(self._buffer)
+            values += [self._buffer[(order,) + tuple(index)]]
+        return np.concatenate(values) if len(values) > 0 else np.empty(0)
+
+    def __getitem__(self, i):
+        "returns snapshot i, a view of the stored array"
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('snapshot index %i out of range' % i)
+        if i < self._n_base:
+            return self._base_item(i)
+        return self._buffer[(self._start + i - self._n_base) % len(self._buffer)]
+
+    def append(self, snapshot):
+        """
+        Adds a snapshot at the end. Returns True if the first snapshot was
+        dropped because the ring buffer is full, i.e. if all indices shifted.
+        """
+        snapshot = np.asarray(snapshot)
+        if self._buffer is None:
+            dtype = snapshot.dtype if self._dtype is None else np.result_type(self._dtype, snapshot.dtype)
+            self._buffer = np.empty((self.maxlen or 16,) + snapshot.shape, dtype=dtype)
+        elif snapshot.shape != self._buffer.shape[1:]:
+            raise ValueError('ERROR: snapshot has shape {}, expected {}'.format(snapshot.shape, self._buffer.shape[1:]))
+        if self.maxlen is not None and self._n == self.maxlen:
+            self._buffer[self._start] = snapshot
+            self._start = (self._start + 1) % self.maxlen
+            return True
+        if self._n == len(self._buffer):
+            #
+            # without ring buffer the storage is doubled, the snapshots
+            # always start at the beginning of it
+            #
+            buffer = np.empty((2 * len(self._buffer),) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+            buffer[:self._n] = self._buffer
+            self._buffer = buffer
+        self._buffer[(self._start + self._n) % len(self._buffer)] = snapshot
+        self._n += 1
+        return False
+
+
+def compact_copy(data, log=False, chunk=2**22):
+    """
+    Returns a float32 copy of `data`, read in blocks of rows such that only
+    about `chunk` elements of the original type are in memory at a time.
+
+    Arguments:
+    data : array-like
+        array, memmap or other object supporting `shape` and row slicing
+
+    Keywords:
+    log : bool
+        if true, store log10 of the data, non-positive values become nan
+    chunk : int
+        approximate number of elements read at a time
+    """
+    shape = np.shape(data)
+    result = np.empty(shape, dtype=np.float32)
+    rows = max(1, chunk // max(1, int(np.prod(shape[1:]))))
+    for i0 in range(0, shape[0], rows):
+        block = np.asarray(data[i0:i0 + rows])
+        if log:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                block = np.log10(np.where(block > 0, block, np.nan))
+        result[i0:i0 + rows] = block
+    return result
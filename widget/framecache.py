@@ -0,0 +1,124 @@
+"""
+On-disk cache of rendered frames.
+
+Frames are stored under a key that is a hash of everything that determines
+how they look: the snapshot data and the render settings. Exporting the same
+snapshots again with the same settings then only copies the cached frames,
+and a re-export after appending data only renders the new snapshots.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+def digest(*items):
+    """
+    Returns a hex digest of the items, which can be arrays (hashed by shape,
+    type and content) or anything else with a deterministic `repr`.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for item in items:
+        if isinstance(item, np.ndarray) or hasattr(item, 'dtype'):
+            a = np.ascontiguousarray(item)
+            h.update(repr((a.shape, a.dtype.str)).encode())
+            h.update(a.view(np.uint8).reshape(-1) if a.size > 0 else b'')
+        else:
+            h.update(repr(item).encode())
+        h.update(b'|')
+    return h.hexdigest()
+
+
+#
+# rcParams that do not change how a figure looks
+#
+RC_IGNORED = ('backend', 'interactive', 'keymap.', 'toolbar', 'webagg.', 'tk.', 'macosx.',
+              'savefig.directory', 'figure.raise_window', 'animation.')
+
+
+def rc_settings(params):
+    """
+    Returns the settings of `params` (matplotlib.rcParams) that can change
+    how a figure looks, as sorted list of (name, value). The values are read
+    as stored, so that the backend is not resolved, which would import
+    pyplot.
+    """
+    return sorted((name, value) for name, value in dict.items(params) if not name.startswith(RC_IGNORED))
+
+
+class FrameCache:
+    """
+    Directory holding rendered frames, either as compressed RGBA arrays
+    (for movies) or as image files of any format.
+
+    Arguments:
+    directory : str
+        the cache directory, created if needed. It can be shared between
+        plotters and sessions.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key[:2], key + ext)
+
+    def _store(self, path, write):
+        "write a file atomically, so that parallel exports never see partial files"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def get_frame(self, key):
+        "returns the cached RGBA frame or None"
+        try:
+            with np.load(self._path(key, '.npz')) as f:
+                return f['frame']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put_frame(self, key, frame):
+        "store an RGBA frame, compressed (usually by a factor of about 10)"
+        frame = np.asarray(frame)
+        self._store(self._path(key, '.npz'), lambda f: np.savez_compressed(f, frame=frame))
+
+    def get_file(self, key, ext, filename):
+        "copy the cached image to filename, returns False if it is not cached"
+        try:
+            shutil.copyfile(self._path(key, ext), filename)
+            return True
+        except OSError:
+            return False
+
+    def put_file(self, key, ext, filename):
+        "store a copy of the image file"
+        with open(filename, 'rb') as src:
+            self._store(self._path(key, ext), lambda f: shutil.copyfileobj(src, f))
+
+    def read(self, key, ext):
+        "returns the content of the cached image file or None"
+        try:
+            with open(self._path(key, ext), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def write(self, key, ext, content):
+        "store the content of an image file"
+        self._store(self._path(key, ext), lambda f: f.write(content))
+
+    def clear(self):
+        "remove all cached frames"
+        for entry in os.listdir(self.directory):
+            path = os.path.join(self.directory, entry)
+            if os.path.isdir(path) and len(entry) == 2:
+                shutil.rmtree(path)
@@ -0,0 +1,157 @@
+"""
+Level-of-detail reduction of the data to the resolution of the screen.
+
+Lines are decimated keeping the minimum and maximum within each pixel column
+of the axes, also for non-uniform x or a logarithmic x axis, so that the
+plotted envelope looks the same as for the full data. 2D data is
+cropped to the visible region and averaged over blocks of 2^k x 2^k cells
+(a level of an image pyramid), such that about one cell per pixel remains.
+"""
+import numpy as np
+
+
+def index_range(coord, lower, upper):
+    """
+    Returns the slice of the monotonically increasing array `coord` that
+    covers [lower, upper], including one more point on each side.
+    """
+    coord = np.asarray(coord)
+    if coord[0] > coord[-1]:
+        return slice(0, len(coord))
+    i0 = max(0, np.searchsorted(coord, lower, side='right') - 1)
+    i1 = min(len(coord), np.searchsorted(coord, upper, side='left') + 1)
+    if i1 - i0 < 2:
+        i0, i1 = max(0, i1 - 2), min(len(coord), i0 + 2)
+    return slice(int(i0), int(i1))
+
+
+def pyramid_level(n, pixels):
+    """
+    Returns the largest power of 2 by which n points can be reduced while
+    keeping at least `pixels` (and at least 2) of them.
+    """
+    f = max(1, int(min(n // max(1, pixels), n // 2)))
+    return 2**int(np.log2(f))
+
+
+def minmax_decimate(x, y, xlim, pixels, to_pixels=None):
+    """
+    Reduce the line (x, y) to the visible range `xlim` and, if it has many
+    more points than `pixels`, to the minimum and maximum in each pixel
+    column.
+
+    Arguments:
+    x, y : arrays
+        line data, x needs to be monotonically increasing
+    xlim : [float, float]
+        visible range of x
+    pixels : int
+        width of the axes in pixels
+
+    Keywords:
+    to_pixels : callable
+        function returning the horizontal display coordinates (in pixels)
+        of an array of x values, like the x component of `ax.transData`.
+        By default xlim is mapped linearly to `pixels` columns.
+
+    Returns:
+    the reduced x and y arrays
+    """
+    sel = index_range(x, min(xlim), max(xlim))
+    x = x[sel]
+    y = y[sel]
+    n = len(x)
+    if n // max(1, int(pixels)) <= 2:
+        return x, y
+    if to_pixels is None:
+        p = (x - xlim[0]) * (pixels / (xlim[1] - xlim[0]))
+    else:
+        p = np.asarray(to_pixels(x), dtype=float)
+    if p[-1] < p[0]:
+        p = -p
+    #
+    # the first point of each pixel column, also of the columns that contain
+    # no point, which are dropped by unique
+    #
+    edges = np.arange(np.floor(p[0]) + 1, np.ceil(p[-1]))
+    starts = np.unique(np.concatenate(([0], np.searchsorted(p, edges))))
+    starts = starts[starts < n]
+    counts = np.diff(np.append(starts, n))
+    #
+    # index of the first minimum and maximum in each column, and of the
+    # first nan, so that gaps in the line are kept
+    #
+    index = np.arange(n)
+    idx = [[0], [n - 1]]
+    for reduce in [np.fmin, np.fmax]:
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        idx += [np.minimum.reduceat(np.where(y == extreme, index, n), starts)]
+    nan = np.isnan(y)
+    if nan.any():
+        idx += [np.minimum.reduceat(np.where(nan, index, n), starts)]
+    idx = np.unique(np.concatenate(idx))
+    idx = idx[idx < n]
+    return x[idx], y[idx]
+
+
+def _block_mean(a, f, axis):
+    "average `a` over blocks of f elements along axis, dropping the remainder"
+    n = a.shape[axis] // f
+    a = np.take(a, np.arange(n * f), axis=axis)
+    shape = a.shape[:axis] + (n, f) + a.shape[axis + 1:]
+    return a.reshape(shape).mean(axis + 1)
+
+
+def reduce_grid(x, y, z, level):
+    """
+    Crop the grid to the given rows and columns and average it over blocks.
+
+    Arguments:
+    x, y : arrays
+        1D or 2D coordinates of the grid as accepted by contourf
+    z : array
+        2D values of shape (ny, nx)
+    level : tuple
+        block size and row and column ranges as returned by `grid_level`
+
+    Returns:
+    the reduced x, y and z arrays
+    """
+    f, r0, r1, c0, c1 = level
+    rows = slice(r0, r1)
+    cols = slice(c0, c1)
+    z = z[rows, cols]
+    x = x[cols] if np.ndim(x) == 1 else x[rows, cols]
+    y = y[rows] if np.ndim(y) == 1 else y[rows, cols]
+    if f > 1:
+        z = _block_mean(_block_mean(z, f, 0), f, 1)
+        x = _block_mean(x, f, 0) if np.ndim(x) == 1 else _block_mean(_block_mean(x, f, 0), f, 1)
+        y = _block_mean(y, f, 0) if np.ndim(y) == 1 else _block_mean(_block_mean(y, f, 0), f, 1)
+    return x, y, z
+
+
+def grid_level(x, y, xlim, ylim, width, height):
+    """
+    Returns the block size and the rows and columns of the grid that are
+    needed to show the range xlim, ylim on width x height pixels.
+
+    Arguments:
+    x, y : arrays
+        1D or 2D coordinates of the grid, only 1D coordinates are cropped
+    xlim, ylim : [float, float]
+        visible range
+    width, height : float
+        size of the axes in pixels
+
+    Returns:
+    (block size, first row, last row + 1, first column, last column + 1)
+    """
+    if np.ndim(x) == 1:
+        cols = index_range(x, min(xlim), max(xlim))
+        rows = index_range(y, min(ylim), max(ylim))
+    else:
+        rows = slice(0, x.shape[0])
+        cols = slice(0, x.shape[1])
+    f = min(pyramid_level(cols.stop - cols.start, width),
+            pyramid_level(rows.stop - rows.start, height))
+    return (f, rows.start, rows.stop, cols.start, cols.stop)
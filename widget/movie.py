@@ -0,0 +1,95 @@
+"""
+Writing movies by piping raw frames into ffmpeg.
+"""
+import os
+import subprocess
+
+#
+# settings of the original PNG based movie export, used for libx264
+#
+X264_ARGS = ['-crf', '20', '-maxrate', '400k', '-bufsize', '1835k']
+
+
+class FFMpegPipe:
+    """
+    Runs ffmpeg in a subprocess that reads raw RGBA frames from its stdin,
+    so that no images need to be written to disk.
+
+    Arguments:
+    filename : str
+        name of the movie file, will be overwritten if it exists
+    size : (int, int)
+        width and height of the frames in pixels
+
+    Keywords:
+    fps : float
+        frames per second
+
+    codec : str
+        video codec passed to ffmpeg as -c:v
+
+    args : list of str
+        additional output options for ffmpeg, defaults to the rate settings
+        in `X264_ARGS` for libx264 and to no options otherwise
+
+    pix_fmt : str
+        pixel format of the movie, frames are padded to even sizes as
+        needed by yuv420p
+
+    ffmpeg : str
+        name or path of the ffmpeg executable
+    """
+
+    def __init__(self, filename, size, fps=10, codec='libx264', args=None, pix_fmt='yuv420p', ffmpeg='ffmpeg'):
+        if args is None:
+            args = X264_ARGS if codec == 'libx264' else []
+        self.filename = filename
+        self.size = size
+        cmd = [ffmpeg, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-vcodec', 'rawvideo', '-pix_fmt', 'rgba',
+               '-s', '%ix%i' % tuple(size), '-r', str(fps), '-i', '-',
+               '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+               '-c:v', codec, '-pix_fmt', pix_fmt] + list(args) + [filename]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        "write one frame, a buffer of height * width * 4 bytes in RGBA order"
+        self._proc.stdin.write(memoryview(frame).cast('B'))
+
+    def close(self):
+        "finish the movie, returns the exit code of ffmpeg"
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        return self._proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        ret = self.close()
+        if ret != 0 and exc[0] in [None, BrokenPipeError]:
+            raise RuntimeError('ERROR: ffmpeg exited with code %i while writing %s' % (ret, self.filename))
+
+
+def concat_movies(parts, filename, ffmpeg='ffmpeg'):
+    """
+    Join movies that were encoded with the same settings into one file
+    without re-encoding them.
+
+    Arguments:
+    parts : list of str
+        file names of the movies in the order in which they are joined
+    filename : str
+        name of the resulting movie, will be overwritten if it exists
+    """
+    listname = parts[0] + '.txt'
+    with open(listname, 'w') as f:
+        for part in parts:
+            f.write("file '{}'\n".format(os.path.abspath(part)))
+    ret = subprocess.call([ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                           '-i', listname, '-c', 'copy', filename])
+    os.remove(listname)
+    if ret != 0:
+        raise RuntimeError('ERROR: ffmpeg exited with code %i while joining %s' % (ret, filename))
@@ -0,0 +1,113 @@
+"""
+The additional lines of a plot (data2 and data3) drawn as collections.
+
+Instead of one `Line2D` per line, all data2 curves are drawn as one
+`LineCollection` and all data3 vertical lines as another one, so that a new
+snapshot replaces the segments of all lines in one operation and each
+collection is drawn in one call. Empty lines with the same styles serve as
+legend entries. Lines with markers cannot be drawn by a collection, these are
+drawn as lines of their own.
+"""
+import numpy as np
+import matplotlib
+from matplotlib.collections import LineCollection
+
+
+class Overlays:
+    """
+    The data2 curves y(x) and the data3 vertical lines x = const on an axes.
+
+    Arguments:
+    ax : Axes
+        the axes to draw on
+    x : array
+        x values of the curves
+    n_curves : int
+        number of curves, the remaining styles and labels belong to the
+        vertical lines
+    styles : list
+        styles of the curves followed by those of the vertical lines, each
+        either a format string like 'r--' or a color
+    labels : list of str
+        labels for the legend, in the same order
+    lw : float
+        line width
+    """
+
+    def __init__(self, ax, x, n_curves, styles, labels, lw):
+        self.ax = ax
+        self.x = np.asarray(x)
+        #
+        # the empty lines take the colors from the property cycle like the
+        # lines plotted by the user would
+        #
+        self.proxies = []
+        for style, label in zip(styles, labels):
+            if isinstance(style, str):
+                line, = ax.plot([], [], style, lw=lw, label=label)
+            else:
+                line, = ax.plot([], [], color=style, lw=lw, label=label)
+            self.proxies += [line]
+        marked = [line.get_marker() not in [None, 'None', '', ' '] for line in self.proxies]
+        self._curves = [j for j in range(n_curves) if not marked[j]]
+        self._vertical = [j for j in range(n_curves, len(styles)) if not marked[j]]
+        self._marked_curves = [j for j in range(n_curves) if marked[j]]
+        self._marked_vertical = [j - n_curves for j in range(n_curves, len(styles)) if marked[j]]
+        self.curves = self._collection(self._curves, lw)
+        self.vertical = self._collection(self._vertical, lw)
+        self._vertical = [j - n_curves for j in self._vertical]
+        self.artists = [c for c in [self.curves, self.vertical] if c is not None] + \
+            [line for line, m in zip(self.proxies, marked) if m]
+
+    def _collection(self, indices, lw):
+        "collection drawing the lines with the given indices like their proxies"
+        if len(indices) == 0:
+            return None
+        proxies = [self.proxies[j] for j in indices]
+        collection = LineCollection(
+            [], colors=[line.get_color() for line in proxies], linestyles=[line.get_linestyle() for line in proxies],
+            linewidths=lw, capstyle=matplotlib.rcParams['lines.dash_capstyle'],
+            joinstyle=matplotlib.rcParams['lines.dash_joinstyle'], label='_nolegend_')
+        self.ax.add_collection(collection, autolim=False)
+        return collection
+
+    def set_curves(self, ys, decimate=None):
+        """
+        Replaces the y values of all curves.
+
+        Arguments:
+        ys : array of shape (n_curves, nx) or list of arrays
+            the new y values
+
+        Keywords:
+        decimate : callable
+            if given, the curves are drawn with the points returned by
+            decimate(x, y)
+        """
+        if self.curves is not None:
+            if decimate is None and isinstance(ys, np.ndarray):
+                segments = np.empty((len(self._curves),) + self.x.shape + (2,))
+                segments[..., 0] = self.x
+                segments[..., 1] = ys[self._curves]
+            else:
+                segments = [np.column_stack(decimate(self.x, ys[j]) if decimate else (self.x, ys[j]))
+                            for j in self._curves]
+            self.curves.set_segments(segments)
+        for j in self._marked_curves:
+            self.proxies[j].set_data(*(decimate(self.x, ys[j]) if decimate else (self.x, ys[j])))
+
+    def set_vertical(self, xs):
+        """
+        Moves the vertical lines to the positions `xs`, spanning the current
+        y range of the axes.
+        """
+        y0, y1 = self.ax.get_ylim()
+        xs = np.asarray(xs, dtype=float)
+        if self.vertical is not None:
+            segments = np.empty((len(self._vertical), 2, 2))
+            segments[:, :, 0] = xs[self._vertical, None]
+            segments[:, 0, 1] = y0
+            segments[:, 1, 1] = y1
+            self.vertical.set_segments(segments)
+        for j in self._marked_vertical:
+            self.proxies[len(self.proxies) - len(xs) + j].set_data([xs[j], xs[j]], [y0, y1])
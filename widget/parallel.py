@@ -0,0 +1,58 @@
+"""
+Running export jobs in forked worker processes.
+
+The workers are forked, so they inherit the data of the plotter without it
+being pickled (memory-mapped data is shared, other arrays are copied on write
+only). They only use the off-screen Agg figures, never the GUI.
+"""
+import multiprocessing
+import time
+
+
+def fork_available():
+    "whether worker processes can be forked on this platform"
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def run_forked(job, chunks, progress=None, interval=0.2):
+    """
+    Run `job(k, chunk, done)` for each of the chunks in its own forked process
+    and wait for all of them.
+
+    Arguments:
+    job : callable
+        function called in the worker as job(k, chunk, done), where k is the
+        index of the chunk and done is a function that the job should call
+        after every finished item
+    chunks : list
+        list of work items for each process
+
+    Keywords:
+    progress : callable
+        called in the parent as progress(n_done, n_total) whenever the number
+        of finished items changes
+    interval : float
+        polling interval in seconds for the progress
+    """
+    ctx = multiprocessing.get_context('fork')
+    counter = ctx.Value('i', 0)
+    n_total = sum(len(chunk) for chunk in chunks)
+
+    def done():
+        with counter.get_lock():
+            counter.value += 1
+
+    procs = [ctx.Process(target=job, args=(k, chunk, done)) for k, chunk in enumerate(chunks)]
+    for proc in procs:
+        proc.start()
+    n_done = 0
+    while any(proc.is_alive() for proc in procs):
+        time.sleep(interval)
+        if progress is not None and counter.value != n_done:
+            n_done = counter.value
+            progress(n_done, n_total)
+    for proc in procs:
+        proc.join()
+    failed = [k for k, proc in enumerate(procs) if proc.exitcode != 0]
+    if len(failed) > 0:
+        raise RuntimeError('ERROR: export worker(s) {} failed'.format(failed))
@@ -0,0 +1,161 @@
+"""
+Playback of the snapshots at a fixed frame rate.
+
+A background thread prepares the upcoming snapshots (reading the data and
+computing the contour geometry) while the GUI displays the current one. The
+number of prepared snapshots is bounded, and when the display cannot keep up
+with the frame rate, the snapshots that are already too late are skipped.
+"""
+import threading
+import time
+from collections import deque
+
+from .cache import reset_after_fork
+
+
+class SnapshotProducer:
+    """
+    Background thread calling `prepare(i)` for the given indices in order and
+    keeping at most `maxsize` prepared indices ready for `take`.
+
+    Arguments:
+    prepare : callable
+        function preparing snapshot i, e.g. by filling a cache
+    indices : sequence of int
+        increasing snapshot indices to prepare
+
+    Keywords:
+    maxsize : int
+        maximum number of prepared snapshots waiting to be displayed
+    """
+
+    def __init__(self, prepare, indices, maxsize=8):
+        self.prepare = prepare
+        self.indices = list(indices)
+        self.maxsize = max(1, maxsize)
+        self._ready = deque()
+        self._target = None
+        self._running = True
+        self._finished = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        reset_after_fork(self._after_fork)
+
+    def _after_fork(self):
+        "the worker thread does not exist in a forked child"
+        self._condition = threading.Condition()
+        self._running = False
+
+    @property
+    def done(self):
+        "true if all indices were prepared and taken"
+        with self._condition:
+            return self._finished and len(self._ready) == 0
+
+    def take(self, target):
+        """
+        Returns the largest prepared index up to `target`, discarding all
+        smaller ones, or None if none is ready. The producer skips ahead to
+        `target` if it is behind.
+        """
+        with self._condition:
+            self._target = target
+            i = None
+            while len(self._ready) > 0 and self._ready[0] <= target:
+                i = self._ready.popleft()
+            self._condition.notify()
+            return i
+
+    def stop(self):
+        "stop the worker thread"
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def _run(self):
+        for i in self.indices:
+            with self._condition:
+                while self._running and len(self._ready) >= self.maxsize:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                #
+                # skip indices that would be displayed too late
+                #
+                if self._target is not None and i < self._target and i != self.indices[-1]:
+                    continue
+            try:
+                self.prepare(i)
+            except Exception as err:
+                print('WARNING: preparing snapshot %i failed: %s' % (i, err))
+            with self._condition:
+                self._ready.append(i)
+        with self._condition:
+            self._finished = True
+
+
+class Player:
+    """
+    Plays snapshots at a fixed frame rate using a timer of the canvas.
+
+    Arguments:
+    canvas : FigureCanvas
+        canvas whose timer drives the playback
+    prepare : callable
+        function preparing snapshot i in a background thread
+    show : callable
+        function displaying snapshot i, called in the GUI thread
+
+    Keywords:
+    fps : float
+        target frame rate
+    buffer : int
+        maximum number of snapshots prepared ahead
+    on_stop : callable
+        called when the playback stops
+    """
+
+    def __init__(self, canvas, prepare, show, fps=10, buffer=8, on_stop=None):
+        self.prepare = prepare
+        self.show = show
+        self.fps = fps
+        self.buffer = buffer
+        self.on_stop = on_stop
+        self.producer = None
+        self._timer = canvas.new_timer(interval=max(1, int(1000 / fps)))
+        self._timer.add_callback(self.tick)
+
+    @property
+    def playing(self):
+        return self.producer is not None
+
+    def start(self, first, last):
+        "play the snapshots first, first + 1, ..., last"
+        self.stop()
+        self._first = first
+        self._last = last
+        self._t0 = time.perf_counter()
+        self.producer = SnapshotProducer(self.prepare, range(first, last + 1), maxsize=self.buffer)
+        self._timer.start()
+
+    def stop(self):
+        "stop the playback"
+        if self.producer is None:
+            return
+        self._timer.stop()
+        self.producer.stop()
+        self.producer = None
+        if self.on_stop is not None:
+            self.on_stop()
+
+    def tick(self):
+        "show the latest prepared snapshot that is due, called by the timer"
+        if self.producer is None:
+            return
+        target = min(self._last, self._first + int((time.perf_counter() - self._t0) * self.fps))
+        i = self.producer.take(target)
+        if i is not None:
+            self.show(i)
+        if i == self._last or self.producer.done:
+            self.stop()
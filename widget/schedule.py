@@ -0,0 +1,62 @@
+"""
+Coalescing of slider events, so that dragging the slider does not queue up
+one full redraw per intermediate value.
+"""
+import time
+
+from matplotlib.backend_bases import TimerBase
+
+
+class UpdateScheduler:
+    """
+    Calls `render(i)` for the latest requested snapshot index only. Requests
+    are collected until the GUI event loop is idle (via a single-shot timer
+    of the canvas), so that indices which were superseded in the meantime are
+    never rendered. Backends without an event loop render immediately.
+
+    Arguments:
+    canvas : FigureCanvas
+        canvas whose timers are used
+    render : callable
+        function rendering snapshot i
+
+    Keywords:
+    max_fps : float
+        if given, render at most this many times per second
+    """
+
+    def __init__(self, canvas, render, max_fps=None):
+        self.render = render
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self._pending = None
+        self._scheduled = False
+        self._last = -float('inf')
+        self._timer = canvas.new_timer(interval=0)
+        self._timer.single_shot = True
+        self._timer.add_callback(self._fire)
+        self.deferred = type(self._timer) is not TimerBase
+
+    def request(self, i):
+        "render snapshot i as soon as the GUI is idle, dropping older requests"
+        self._pending = i
+        if not self.deferred:
+            self._fire()
+        elif not self._scheduled:
+            wait = max(0.0, self._last + self.interval - time.perf_counter())
+            self._scheduled = True
+            self._timer.interval = int(1000 * wait)
+            self._timer.start()
+
+    def stop(self):
+        "discard the pending request"
+        self._timer.stop()
+        self._scheduled = False
+        self._pending = None
+
+    def _fire(self):
+        self._scheduled = False
+        i, self._pending = self._pending, None
+        if i is None:
+            return
+        self._last = time.perf_counter()
+        self.render(i)
@@ -0,0 +1,296 @@
+"""
+Serving the snapshots of a plotter as images over HTTP, to look at them in a
+web browser on machines without a Python GUI.
+
+The images are rendered with the off-screen figures also used for exports,
+in forked worker processes where available, and kept in memory (and in the
+plotter's frame cache, if it has one). The workers are forked again when
+snapshots are appended or the settings or GUI limits of the plotter change,
+so that they always draw what the ETags describe. The neighbours of every requested
+snapshot are rendered in advance. Each image has an ETag derived from the
+hash of its content, so browsers only download changed images again.
+"""
+import io
+import json
+import multiprocessing
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .cache import LRUCache
+from .parallel import fork_available
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>widget</title>
+<style>
+body {{ font-family: sans-serif; margin: 1em; }}
+input {{ width: 80%; }}
+</style>
+</head>
+<body>
+<div><img id="frame" src="frame/0.{fmt}"></div>
+<div>
+<input id="slider" type="range" min="0" max="{i_max}" value="0">
+<span id="label">0</span>
+</div>
+<script>
+var slider = document.getElementById('slider');
+var frame = document.getElementById('frame');
+var label = document.getElementById('label');
+var loading = false, wanted = null;
+function show(i) {{
+    if (loading) {{ wanted = i; return; }}
+    loading = true;
+    frame.src = 'frame/' + i + '.{fmt}';
+    label.textContent = i;
+}}
+frame.onload = frame.onerror = function() {{
+    loading = false;
+    if (wanted !== null) {{ var i = wanted; wanted = null; show(i); }}
+}};
+slider.oninput = function() {{ show(slider.value); }};
+</script>
+</body>
+</html>
+"""
+
+MIME_TYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+
+#
+# state of the worker processes, inherited when they are forked
+#
+_worker_plotter = None
+_worker_draw = None
+
+
+def _init_worker():
+    global _worker_draw
+    _worker_draw = _worker_plotter._renderer()
+
+
+def _render_worker(i, fmt):
+    return render_image(_worker_draw, i, fmt)
+
+
+def render_image(draw, i, fmt):
+    "draw snapshot i with the renderer `draw` and return the image file content"
+    fig = draw(i)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, facecolor=fig.get_facecolor(), dpi=fig.dpi)
+    return buf.getvalue()
+
+
+class FrameServer:
+    """
+    HTTP server showing the snapshots of a plotter on a page with a slider.
+    The images are available as /frame/<index>.<fmt>, the number of
+    snapshots and the image format as /info.
+
+    Arguments:
+    plotter : plotter
+        the plotter whose snapshots are served, best created with gui=False
+
+    Keywords:
+    host, port : str, int
+        address of the server, by default only reachable from this machine
+    fmt : str
+        image format
+    workers : int
+        number of processes rendering the images
+    prefetch : int
+        number of snapshots before and after the requested one that are
+        rendered in advance
+    cache_size : int
+        number of images kept in memory
+    """
+
+    def __init__(self, plotter, host='127.0.0.1', port=8000, fmt='png', workers=2, prefetch=3, cache_size=64):
+        self.plotter = plotter
+        self.fmt = fmt
+        self.prefetch = prefetch
+        self.images = LRUCache(cache_size)
+        self.workers = workers if fork_available() else 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._draw_lock = threading.Lock()
+        self._pool = None
+        self._state = None
+        self._sync()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://{}:{}/'.format(host, port)
+
+    def _sync(self):
+        """
+        fork the workers (or create the renderer) again if the state of the
+        plotter changed since they were created. The old workers finish the
+        images they were given, these are stored under their old keys.
+        """
+        global _worker_plotter
+        state = self.plotter._frame_state()
+        with self._lock:
+            if state == self._state:
+                return
+            self._state = state
+            if self.workers > 0:
+                if self._pool is not None:
+                    self._pool.close()
+                    threading.Thread(target=self._pool.join, daemon=True).start()
+                _worker_plotter = self.plotter
+                self._pool = multiprocessing.get_context('fork').Pool(self.workers, initializer=_init_worker)
+            else:
+                with self._draw_lock:
+                    self._draw = self.plotter._renderer()
+
+    def etag(self, i):
+        """
+        ETag of snapshot i, the hash of everything that determines the image.
+        The hash of the snapshot data is kept by the plotter, so only the
+        first request of a snapshot reads and hashes it.
+        """
+        self._sync()
+        return self.plotter._frame_keys([i], [self.fmt])[0][0]
+
+    def _submit(self, i, key):
+        "start rendering snapshot i in a worker unless it is cached or rendered already"
+        with self._lock:
+            if key in self._pending or key in self.images:
+                return
+            self._pending[key] = self._pool.apply_async(
+                _render_worker, (i, self.fmt), callback=lambda content: self._store(key, content),
+                error_callback=lambda err: self._failed(key, err))
+
+    def _store(self, key, content):
+        self.images.put(key, content)
+        if self.plotter.frame_cache is not None:
+            self.plotter.frame_cache.write(key, '.' + self.fmt, content)
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _failed(self, key, err):
+        print('WARNING: rendering failed: %s' % err)
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def image(self, i, key):
+        "returns the image of snapshot i, rendering it if needed"
+        content = self.images.get(key)
+        if content is None and self.plotter.frame_cache is not None:
+            content = self.plotter.frame_cache.read(key, '.' + self.fmt)
+            if content is not None:
+                self.images.put(key, content)
+        if content is not None:
+            return content
+        if self._pool is None:
+            with self._draw_lock:
+                content = render_image(self._draw, i, self.fmt)
+            self._store(key, content)
+            return content
+        self._submit(i, key)
+        with self._lock:
+            result = self._pending.get(key)
+        if result is None:
+            #
+            # finished in the meantime
+            #
+            return self.images.get(key) or self.image(i, key)
+        return result.get()
+
+    def prefetch_around(self, i):
+        "render the neighbours of snapshot i in the worker processes"
+        if self._pool is None:
+            return
+        for offset in range(1, self.prefetch + 1):
+            for j in (i + offset, i - offset):
+                if 0 <= j < self.plotter.nt:
+                    self._submit(j, self.etag(j))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send(self, code, content, mime, headers={}):
+                self.send_response(code)
+                self.send_header('Content-Type', mime)
+                self.send_header('Content-Length', str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/':
+                    page = PAGE.format(fmt=server.fmt, i_max=server.plotter.nt - 1)
+                    self.send(200, page.encode(), 'text/html; charset=utf-8')
+                elif path == '/info':
+                    info = {'nt': server.plotter.nt, 'fmt': server.fmt}
+                    self.send(200, json.dumps(info).encode(), 'application/json')
+                elif path.startswith('/frame/'):
+                    self.send_frame(path[len('/frame/'):])
+                else:
+                    self.send(404, b'not found', 'text/plain')
+
+            def send_frame(self, name):
+                index, _, fmt = name.partition('.')
+                if not index.isdigit() or int(index) >= server.plotter.nt or fmt != server.fmt:
+                    self.send(404, b'not found', 'text/plain')
+                    return
+                i = int(index)
+                key = server.etag(i)
+                headers = {'ETag': '"%s"' % key, 'Cache-Control': 'no-cache'}
+                if self.headers.get('If-None-Match') == headers['ETag']:
+                    self.send_response(304)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.end_headers()
+                else:
+                    try:
+                        content = server.image(i, key)
+                    except Exception as err:
+                        self.send(500, str(err).encode(), 'text/plain')
+                        return
+                    self.send(200, content, MIME_TYPES.get(server.fmt, 'application/octet-stream'), headers)
+                    #
+                    # the browser has the image if it was not modified, then
+                    # its neighbours are usually cached as well
+                    #
+                    server.prefetch_around(i)
+
+        return Handler
+
+    def start(self):
+        "serve in a background thread"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        "serve until interrupted with Ctrl-C"
+        print('serving snapshots at %s' % self.url)
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        "stop the server and the worker processes"
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread = None
+        self.httpd.server_close()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
@@ -0,0 +1,199 @@
+"""
+Data sources that read one snapshot per file.
+
+A `FileSource` can be passed to `plotter` instead of the `data`, `data2` or
+`y` arrays. It behaves like an array of shape (nt, ...) but only reads the
+snapshots that are accessed, keeps the most recent ones in a cache and reads
+the neighbours of the last accessed snapshot in background threads.
+"""
+import glob
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .cache import LRUCache, reset_after_fork
+
+
+def read_npy(filename):
+    "read a .npy file"
+    return np.load(filename)
+
+
+def read_npz(filename, key=None):
+    "read the array `key` (by default the first one) of a .npz file"
+    with np.load(filename) as f:
+        return f[key or f.files[0]]
+
+
+def raw_reader(shape, dtype=float, offset=0):
+    """
+    Returns a reader for raw binary files containing one array of the given
+    shape and dtype, starting `offset` bytes into the file.
+    """
+    def read_raw(filename):
+        return np.fromfile(filename, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    return read_raw
+
+
+READERS = {'.npy': read_npy, '.npz': read_npz}
+
+
+class FileSource:
+    """
+    Snapshots stored in separate files, read on demand.
+
+    Arguments:
+    files : str | list of str
+        the file names in the order of the snapshots, or a glob pattern
+        (the matching files are sorted by name)
+
+    Keywords:
+    reader : callable
+        function returning the snapshot stored in a file. By default .npy
+        and .npz files are read with numpy, see `raw_reader` for raw binary
+        files.
+    cache_size : int
+        number of snapshots that are kept in memory
+    prefetch : int
+        number of snapshots ahead of and behind the last accessed one that
+        are read in the background
+    workers : int
+        number of threads reading files in the background
+
+    Example:
+    >>> data = FileSource('output/density_*.npy')
+    >>> p = plotter(x, data, y=y, zlim=[1e-5, 1])
+    """
+
+    def __init__(self, files, reader=None, cache_size=16, prefetch=2, workers=2):
+        if isinstance(files, str):
+            files = sorted(glob.glob(files))
+        self.files = list(files)
+        if len(self.files) == 0:
+            raise ValueError('ERROR: no files given')
+        if reader is None:
+            ext = os.path.splitext(self.files[0])[1].lower()
+            if ext not in READERS:
+                raise ValueError('ERROR: no reader for files of type \'{}\', pass one as reader'.format(ext))
+            reader = READERS[ext]
+        self.reader = reader
+        self.prefetch = max(0, min(prefetch, (cache_size - 1) // 2))
+        self.workers = workers
+        self.cache = LRUCache(max(1, cache_size))
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        reset_after_fork(self._after_fork)
+        #
+        # the first snapshot defines shape and type of all of them
+        #
+        first = self._load(0)
+        self._snapshot_shape = first.shape
+        self.dtype = first.dtype
+
+    def _after_fork(self):
+        "the worker threads do not exist in a forked child"
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._executor = None
+
+    @property
+    def shape(self):
+        return (len(self.files),) + self._snapshot_shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return len(self.files)
+
+    def _read(self, i):
+        d = np.asarray(self.reader(self.files[i]))
+        d.flags.writeable = False
+        return d
+
+    def _load(self, i):
+        "return snapshot i from the cache or read it into the cache"
+        d = self.cache.get(i)
+        if d is None:
+            d = self._read(i)
+            self.cache.put(i, d)
+        return d
+
+    def _background_load(self, i):
+        try:
+            self._load(i)
+        except Exception as err:
+            print('WARNING: reading %s failed: %s' % (self.files[i], err))
+        finally:
+            with self._lock:
+                self._pending.discard(i)
+
+    def _prefetch(self, center):
+        "read the neighbours of snapshot `center` in the background"
+        if self.prefetch == 0 or self.workers < 1:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers)
+            for offset in range(1, self.prefetch + 1):
+                for i in (center + offset, center - offset):
+                    if 0 <= i < len(self) and i not in self._pending and i not in self.cache:
+                        self._pending.add(i)
+                        self._executor.submit(self._background_load, i)
+
+    def __getitem__(self, index):
+        """
+        Returns snapshot `index`, or for a slice the selected snapshots as
+        one array. Slices are read without using the cache, they are meant
+        for passes over all the data.
+        """
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            result = np.empty((len(indices),) + self._snapshot_shape, dtype=self.dtype)
+            for j, i in enumerate(indices):
+                d = self.cache.get(i)
+                result[j] = self._read(i) if d is None else d
+            return result
+        i = int(index)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('snapshot index %i out of range' % i)
+        d = self._load(i)
+        self._prefetch(i)
+        return d
+
+    def _value(self, i, index):
+        "the value at `index` of snapshot i, without caching the snapshot"
+        d = self.cache.get(i)
+        if d is not None:
+            return d[index]
+        if self.reader is read_npy:
+            return np.load(self.files[i], mmap_mode='r')[index]
+        return self._read(i)[index]
+
+    def time_series(self, index):
+        """
+        Returns the values at `index` of all snapshots. The snapshots that
+        are not cached are read in the background threads, .npy files are
+        memory-mapped so that only the needed part of them is read.
+        """
+        index = tuple(index)
+        if self.workers < 1:
+            return np.array([self._value(i, index) for i in range(len(self))])
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers)
+            executor = self._executor
+        return np.array(list(executor.map(lambda i: self._value(i, index), range(len(self)))))
+
+    def close(self):
+        "stop the background threads"
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,229 @@
+"""
+Per-snapshot statistics of the data, used to set the plot limits.
+
+The statistics are computed in a single pass over the data, reading a few
+snapshots at a time, and can be stored in a small .npz file so that they do
+not need to be recomputed for the next plot of the same data.
+"""
+import os
+
+import numpy as np
+
+from .framecache import digest
+
+
+class SnapshotStats:
+    """
+    Minimum, maximum, smallest positive value and optionally percentiles of
+    each snapshot.
+
+    Arguments:
+    vmin, vmax, posmin : arrays of length nt
+        minimum, maximum and smallest positive value (nan if there is none)
+        of each snapshot
+
+    Keywords:
+    q : array
+        the percentiles that were computed
+    percentiles : array of shape (nt, len(q))
+        the percentiles of each snapshot
+    signature : str
+        `data_signature` of the data the statistics belong to
+    """
+
+    def __init__(self, vmin, vmax, posmin, q=[], percentiles=None, signature=''):
+        self.vmin = np.asarray(vmin, dtype=float)
+        self.vmax = np.asarray(vmax, dtype=float)
+        self.posmin = np.asarray(posmin, dtype=float)
+        self.q = np.asarray(q, dtype=float)
+        if percentiles is None:
+            percentiles = np.zeros([len(self.vmin), 0])
+        self.percentiles = np.asarray(percentiles, dtype=float)
+        self.signature = signature
+
+    def __len__(self):
+        return len(self.vmin)
+
+    @classmethod
+    def compute(cls, data, ny=None, q=[], chunk=2**22):
+        """
+        Computes the statistics in one pass over the data.
+
+        Arguments:
+        data : array-like
+            data of shape (nt, ...) or (nt*ny, nx), can be a np.memmap or
+            other object supporting row slicing
+
+        Keywords:
+        ny : int
+            number of rows per snapshot for 2D data of shape (nt*ny, nx)
+        q : list
+            percentiles to compute for each snapshot
+        chunk : int
+            approximate number of elements read at a time
+        """
+        shape = np.shape(data)
+        ny = ny or 1
+        nt = shape[0] // ny
+        size = ny * int(np.prod(shape[1:]))
+        step = max(1, chunk // size)
+        vmin = np.zeros(nt)
+        vmax = np.zeros(nt)
+        posmin = np.zeros(nt)
+        percentiles = np.zeros([nt, len(q)])
+        for i0 in range(0, nt, step):
+            i1 = min(nt, i0 + step)
+            block = np.asarray(data[i0 * ny:i1 * ny]).reshape(i1 - i0, size)
+            vmin[i0:i1] = block.min(1)
+            vmax[i0:i1] = block.max(1)
+            posmin[i0:i1] = np.where(block > 0, block, np.inf).min(1)
+            if len(q) > 0:
+                percentiles[i0:i1] = np.percentile(block, q, axis=1).T
+        posmin[np.isinf(posmin)] = np.nan
+        return cls(vmin, vmax, posmin, q=q, percentiles=percentiles)
+
+    def append(self, snapshot, maxlen=None):
+        """
+        Adds the statistics of one more snapshot, keeping only those of the
+        last `maxlen` snapshots if it is given.
+        """
+        new = SnapshotStats.compute(np.asarray(snapshot)[None], q=self.q)
+        sel = slice(None) if maxlen is None else slice(-maxlen, None)
+        self.vmin = np.append(self.vmin, new.vmin)[sel]
+        self.vmax = np.append(self.vmax, new.vmax)[sel]
+        self.posmin = np.append(self.posmin, new.posmin)[sel]
+        self.percentiles = np.append(self.percentiles, new.percentiles, axis=0)[sel]
+
+    def copy(self):
+        "returns an independent copy, e.g. for a plotter that appends to it"
+        return SnapshotStats(self.vmin.copy(), self.vmax.copy(), self.posmin.copy(), q=self.q.copy(),
+                             percentiles=self.percentiles.copy(), signature=self.signature)
+
+    def tail(self, n):
+        "returns the statistics of the last n snapshots"
+        return SnapshotStats(self.vmin[-n:], self.vmax[-n:], self.posmin[-n:], q=self.q,
+                             percentiles=self.percentiles[-n:])
+
+    def save(self, filename):
+        "store the statistics in a .npz file"
+        np.savez(filename, vmin=self.vmin, vmax=self.vmax, posmin=self.posmin,
+                 q=self.q, percentiles=self.percentiles, signature=self.signature)
+
+    @classmethod
+    def load(cls, filename):
+        "read statistics stored with `save`"
+        with np.load(filename) as f:
+            signature = str(f['signature']) if 'signature' in f.files else ''
+            return cls(f['vmin'], f['vmax'], f['posmin'], q=f['q'], percentiles=f['percentiles'],
+                       signature=signature)
+
+    def limits(self, i=None, mode='global', q=None, positive=False):
+        """
+        Returns the limits [lower, upper] for snapshot i or, if i is None, for
+        all snapshots.
+
+        Keywords:
+        mode : str
+            - 'global' or 'snapshot': minimum and maximum
+            - 'percentile': the percentiles given by `q`
+        q : [float, float]
+            the lower and upper percentile for mode='percentile', these
+            need to be part of the computed percentiles
+        positive : bool
+            if true, use the smallest positive value as lower limit if the
+            minimum is not positive (for logarithmic axes)
+        """
+        sel = slice(None) if i is None else slice(i, i + 1)
+        if mode == 'percentile':
+            for qi in q:
+                if qi not in self.q:
+                    raise ValueError('ERROR: percentile {} was not computed'.format(qi))
+            lower = self.percentiles[sel, list(self.q).index(q[0])].min()
+            upper = self.percentiles[sel, list(self.q).index(q[1])].max()
+        else:
+            lower = self.vmin[sel].min()
+            upper = self.vmax[sel].max()
+        if positive and lower <= 0:
+            lower = np.nanmin(self.posmin[sel])
+        return [lower, upper]
+
+
+def data_signature(data, ny=None, chunk=2**22):
+    """
+    Returns a digest identifying `data`: its shape and type and, for data
+    read from files (memory-mapped data or a `FileSource`), the size and
+    modification time of the files and the values of the first and last
+    snapshot. Other data has no modification time, its values are hashed
+    completely, reading `chunk` elements at a time. Statistics stored for
+    other data, or before the data was changed, then have a different
+    signature.
+    """
+    shape = np.shape(data)
+    ny = ny or 1
+    nt = shape[0] // ny
+    files = getattr(data, 'files', None)
+    if files is None:
+        files = [data.filename] if getattr(data, 'filename', None) is not None else []
+    items = [shape, str(getattr(data, 'dtype', ''))]
+    if len(files) > 0:
+        for name in files:
+            try:
+                st = os.stat(name)
+                items += [(str(name), st.st_size, st.st_mtime_ns)]
+            except OSError:
+                items += [(str(name), None, None)]
+        if nt > 0:
+            items += [np.asarray(data[:ny]), np.asarray(data[(nt - 1) * ny:nt * ny])]
+    else:
+        size = ny * int(np.prod(shape[1:]))
+        step = max(1, chunk // max(1, size))
+        items += [digest(np.asarray(data[i0 * ny:min(nt, i0 + step) * ny])) for i0 in range(0, nt, step)]
+    return digest(*items)
+
+
+def get_stats(data, stats=None, ny=None, q=[]):
+    """
+    Returns the `SnapshotStats` of `data`.
+
+    Arguments:
+    data : array-like
+        the data passed to `plotter`
+
+    Keywords:
+    stats : None | SnapshotStats | str | True
+        - None: compute the statistics
+        - SnapshotStats: use (a copy of) these, e.g. from another plotter of
+          the same data
+        - str: file name, read from there if it exists and belongs to the
+          same data (see `data_signature`), else compute and store them
+          there
+        - True: like str, using a file next to the data if it is a np.memmap
+    ny : int
+        number of rows per snapshot for 2D data
+    q : list
+        percentiles that need to be computed
+    """
+    if isinstance(stats, SnapshotStats):
+        #
+        # a copy, as appending to one plotter must not change the statistics
+        # of the plotter they came from
+        #
+        return stats.copy()
+    filename = None
+    if stats is True:
+        if getattr(data, 'filename', None) is None:
+            raise ValueError('ERROR: stats=True needs memory-mapped data, pass a file name instead')
+        filename = str(data.filename) + '.stats.npz'
+    elif stats is not None:
+        filename = stats
+    if filename is None:
+        return SnapshotStats.compute(data, ny=ny, q=q)
+    signature = data_signature(data, ny=ny)
+    if os.path.isfile(filename):
+        result = SnapshotStats.load(filename)
+        if result.signature == signature and all(qi in result.q for qi in q):
+            return result
+    result = SnapshotStats.compute(data, ny=ny, q=q)
+    result.signature = signature
+    result.save(filename)
+    return result
@@ -0,0 +1,104 @@
+"""
+Timing of the stages of an update, to find out where the time goes when
+scrubbing through the data feels slow.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from .cache import reset_after_fork
+
+
+class Timings:
+    """
+    Collects the durations of named stages. For each stage, the number of
+    calls and the total time are counted and the last `maxlen` durations
+    are kept for the percentiles. Recording is thread-safe, so stages can
+    also be timed in background threads.
+
+    Keywords:
+    maxlen : int
+        number of durations per stage kept for the percentiles
+    callback : callable
+        called as callback(stage, seconds) after each recorded duration
+    """
+
+    def __init__(self, maxlen=1000, callback=None):
+        self.maxlen = maxlen
+        self.callback = callback
+        self.counts = {}
+        self.totals = {}
+        self._recent = {}
+        self._lock = threading.Lock()
+        reset_after_fork(self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        "add a duration in seconds to the given stage"
+        with self._lock:
+            if stage not in self.counts:
+                self.counts[stage] = 0
+                self.totals[stage] = 0.0
+                self._recent[stage] = deque(maxlen=self.maxlen)
+            self.counts[stage] += 1
+            self.totals[stage] += seconds
+            self._recent[stage].append(seconds)
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    @contextmanager
+    def stage(self, stage):
+        "time the enclosed block as the given stage"
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    def recent(self, stage, n=None):
+        "returns the last n (default: all kept) durations of the stage in seconds"
+        with self._lock:
+            values = list(self._recent.get(stage, []))
+        return values if n is None else values[-n:]
+
+    def summary(self):
+        """
+        Returns a dictionary with an entry for each stage containing the
+        count, the total time in seconds and the mean, median, 90th and 99th
+        percentile and maximum of the recent durations in milliseconds.
+        """
+        result = {}
+        with self._lock:
+            stages = {stage: np.array(values) for stage, values in self._recent.items()}
+            for stage, values in stages.items():
+                result[stage] = {'count': self.counts[stage], 'total': self.totals[stage],
+                                 'mean': float(1e3 * values.mean()),
+                                 'p50': float(1e3 * np.percentile(values, 50)),
+                                 'p90': float(1e3 * np.percentile(values, 90)),
+                                 'p99': float(1e3 * np.percentile(values, 99)),
+                                 'max': float(1e3 * values.max())}
+        return result
+
+    def report(self):
+        "returns the summary as a table"
+        lines = ['{:<10s} {:>7s} {:>9s} {:>9s} {:>9s} {:>9s} {:>9s}'.format(
+            'stage', 'count', 'total s', 'mean ms', 'p50 ms', 'p90 ms', 'max ms')]
+        for stage, s in self.summary().items():
+            lines += ['{:<10s} {:7d} {:9.3f} {:9.2f} {:9.2f} {:9.2f} {:9.2f}'.format(
+                stage, s['count'], s['total'], s['mean'], s['p50'], s['p90'], s['max'])]
+        return '\n'.join(lines)
+
+    def reset(self):
+        "forget all recorded durations"
+        with self._lock:
+            self.counts.clear()
+            self.totals.clear()
+            self._recent.clear()
+
+    def __repr__(self):
+        return self.report()
@@ -0,0 +1,153 @@
+"""
+Derived quantities computed per snapshot when they are needed.
+
+A `TransformedData` behaves like an array of shape (nt, ...) holding the
+result of user functions applied to each snapshot of the data, but computes a
+snapshot only when it is accessed and keeps the most recent results in a
+cache. Derived views like normalized profiles, ratios or differences between
+snapshots then neither cost time up front nor a second copy of the data.
+"""
+import numpy as np
+
+from .cache import LRUCache
+
+
+class TransformedData:
+    """
+    Snapshots of `data` passed through a chain of functions on access.
+
+    Arguments:
+    data : array-like
+        the data, of shape (nt, ...) or (nt*rows, nx), can be memory-mapped
+        or a `FileSource`
+    functions : callable | list of callables
+        applied in order to each snapshot as f(d, i), where d is the snapshot
+        and i its index, returning the transformed snapshot
+
+    Keywords:
+    rows : int
+        number of rows per snapshot if data has the shape (nt*rows, nx)
+    cache_size : int
+        number of transformed snapshots that are kept in memory
+    batch : bool
+        if true, the functions are vectorized over snapshots: they are called
+        as f(block, indices) with a block of shape (n, ...) of n snapshots
+        and the array of their indices, also for single snapshots (n = 1)
+    batch_size : int
+        number of snapshots transformed together by `prefetch` and slices
+
+    Example:
+    >>> ratio = TransformedData(data, lambda d, i: d / data2[i])
+    >>> p = plotter(x, ratio, times=times)
+    """
+
+    def __init__(self, data, functions, rows=None, cache_size=32, batch=False, batch_size=16):
+        if callable(functions):
+            functions = [functions]
+        self.data = data
+        self.functions = list(functions)
+        self.rows = rows
+        self.batch = batch
+        self.batch_size = max(1, batch_size)
+        self.cache = LRUCache(max(1, cache_size))
+        self._n = np.shape(data)[0] // (rows or 1)
+        #
+        # the first snapshot defines shape and type of all of them
+        #
+        first = self[0]
+        self._snapshot_shape = first.shape
+        self.dtype = first.dtype
+
+    @property
+    def shape(self):
+        return (self._n,) + self._snapshot_shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self._n
+
+    def _read(self, i0, i1):
+        "the untransformed snapshots i0 ... i1 - 1 as array of shape (i1 - i0, ...)"
+        if self.rows is None:
+            return np.asarray(self.data[i0:i1])
+        block = np.asarray(self.data[i0 * self.rows:i1 * self.rows])
+        return block.reshape((i1 - i0, self.rows) + block.shape[1:])
+
+    def apply(self, block, indices):
+        """
+        Returns the transformed snapshots of `block`, an array of shape
+        (n, ...) holding the untransformed snapshots with the given indices.
+        """
+        if self.batch:
+            indices = np.asarray(indices)
+            for f in self.functions:
+                block = f(block, indices)
+            return np.asarray(block)
+        result = []
+        for d, i in zip(block, indices):
+            for f in self.functions:
+                d = f(d, i)
+            result += [np.asarray(d)]
+        return np.array(result)
+
+    def _compute(self, i0, i1):
+        "transform the snapshots i0 ... i1 - 1 at once and cache them"
+        block = self.apply(self._read(i0, i1), range(i0, i1))
+        for i, d in zip(range(i0, i1), block):
+            d.flags.writeable = False
+            self.cache.put(i, d)
+        return block
+
+    def prefetch(self, indices):
+        """
+        Transforms the snapshots with the given indices that are not cached
+        yet, contiguous ones in batches of `batch_size`.
+        """
+        missing = [i for i in indices if i not in self.cache][:self.cache.maxsize]
+        k = 0
+        while k < len(missing):
+            n = 1
+            while k + n < len(missing) and n < self.batch_size and missing[k + n] == missing[k] + n:
+                n += 1
+            self._compute(missing[k], missing[k] + n)
+            k += n
+
+    def time_series(self, index):
+        """
+        Returns the transformed values at `index` of all snapshots, computed
+        in batches without using the cache.
+        """
+        values = np.empty(len(self), dtype=self.dtype)
+        for i0 in range(0, len(self), self.batch_size):
+            i1 = min(len(self), i0 + self.batch_size)
+            values[i0:i1] = self.apply(self._read(i0, i1), range(i0, i1))[(slice(None),) + tuple(index)]
+        return values
+
+    def __getitem__(self, index):
+        """
+        Returns the transformed snapshot `index`, or for a slice the selected
+        snapshots as one array. Slices are transformed in batches without
+        using the cache, they are meant for passes over all the data.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return np.array([self[i] for i in range(start, stop, step)])
+            blocks = [self.apply(self._read(i0, min(stop, i0 + self.batch_size)),
+                                 range(i0, min(stop, i0 + self.batch_size)))
+                      for i0 in range(start, stop, self.batch_size)]
+            if len(blocks) == 0:
+                return np.empty((0,) + self._snapshot_shape, dtype=self.dtype)
+            return np.concatenate(blocks)
+        i = int(index)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('snapshot index %i out of range' % i)
+        d = self.cache.get(i)
+        if d is None:
+            d = self._compute(i, i + 1)[0]
+        return d
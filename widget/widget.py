@@ -1,18 +1,34 @@
 #!/usr/bin/env python
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import LogNorm
-from matplotlib.widgets import Slider, Button
+import matplotlib
+from matplotlib.colors import LogNorm, Normalize
+from matplotlib.contour import ContourSet
 from matplotlib import ticker
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import os
-import subprocess
-import shutil
-from string import ascii_letters
-from random import choice
-from mpl_toolkits.axes_grid1.axes_divider import make_axes_locatable
+import tempfile
+import time
+
+from .blit import BlitManager
+from .cache import LRUCache
+from .contours import contour_geometry, ContourPrefetcher
+from .data import data_range, compact_copy, time_series, SnapshotSeries
+from .framecache import FrameCache, digest, rc_settings
+from .lod import minmax_decimate, grid_level, reduce_grid
+from .stats import get_stats
+from .movie import FFMpegPipe, concat_movies
+from .overlays import Overlays
+from .parallel import fork_available, run_forked
+from .player import Player
+from .schedule import UpdateScheduler
+from .source import FileSource
+from .timing import Timings
+from .transform import TransformedData
 
 
 def main():
+    import matplotlib.pyplot as plt
     x = np.linspace(1.0, 10.0, 200)
     y = np.linspace(1.0, 10.0, 200)
     times = np.linspace(1.0, 11.0, 100)
@@ -38,23 +54,34 @@ class plotter:
     def __init__(self, x, data, y=None, data2=[], data3=[], times=None, timestr='', i_start=0,
                  xlog=False, ylog=False, zlog=False, xlim=None, ylim=None, zlim=None, xlabel='', ylabel='',
                  lstyle='-', ncont=None, cmap=None, ext_link=None, fill=True, bg_color='w', bg_color_ax='none', colbar=False,
-                 show_legend=False, data_label=None, data2_label=None, data3_label=None, lw=2, dpi=None, **kwargs):
+                 show_legend=False, data_label=None, data2_label=None, data3_label=None, lw=2, dpi=None,
+                 mode='contour', cache_size=32, prefetch=5, blit=True, limits='global', percentile=[1, 99],
+                 stats=None, lod=False, gui=True, max_fps=None, timing_callback=None, show_fps=False,
+                 play_fps=10, play_buffer=8, ring_buffer=None,
+                 frame_cache=None, compact=False, transform=None, batch_transform=False, probe=False,
+                 **kwargs):
         """
         creates a GUI to display timedependent 1D or 2D data.
 
         Arguments:
-        x    = the x axis array of length nx
+        x    = the x axis array of length nx, for 2D data also an array of
+               shape (ny,nx) or (nt,ny,nx) for time dependent coordinates
         data = - array of the form (nt,nx) for nt 1D snapshots
-               - array of the form (nt*ny,nx) for nt 2D snapshots
+               - array of the form (nt,ny,nx) or (nt*ny,nx) for nt 2D snapshots
+               can also be a np.memmap, a `FileSource` reading one file per
+               snapshot, a `TransformedData` or other array-like object
+               supporting slicing, it is only read one snapshot at a time
 
         Keywords:
         y
-             y axis array for data of a form (ntny,nx) where the first ny rows are the fist snapshot
+             y axis array for 2D data, either of length ny, of shape (ny,nx),
+             or time dependent of shape (nt,ny,nx) or (nt*ny,nx) where the
+             first ny rows are the first snapshot, or a `FileSource`
 
         data2
              for plotting additional 1-dimensional y(x) data on the 1D or 2D plot
             join in a list if several data-sets should be included like
-            [y1 , y2] where y1,y2 are arrays of shape (nt,nx)
+            [y1 , y2] where y1,y2 are arrays of shape (nt,nx) or `FileSource`s
 
         data3
              for plotting additional vertical lines on the 1D or 2D plot
@@ -91,7 +118,8 @@ class plotter:
              color map for the contours
 
         ext_link
-             link an onther plotter object to the slider of the current one
+             link an onther plotter object to the slider of the current one,
+             it needs to have a GUI
 
         bg_color : color spec
              background color of plot
@@ -120,48 +148,201 @@ class plotter:
         dpi : int
             dpi for plotting images, defaults to rcParams['figure.dpi']
 
+        mode : string
+            how 2D data is displayed:
+            - 'contour': filled contours at the levels given by zlim, ncont
+            - 'image': drawn once with imshow (needs evenly spaced 1D x and y),
+              later snapshots only replace the image array
+            - 'mesh': drawn once with pcolormesh, later snapshots only replace
+              the array (the mesh is rebuilt if y is time dependent)
+
+        cache_size : int
+            number of 2D snapshots for which the contour geometry is kept in
+            memory, set to 0 to disable caching. Also the number of snapshots
+            kept after a `transform`.
+
+        prefetch : int
+            number of 2D snapshots ahead of and behind the current one for
+            which the contours are computed in a background thread, set to 0
+            to only cache what has been displayed
+
+        blit : bool
+            if true and supported by the backend, slider updates only redraw
+            the data, the additional lines, the title and the slider on top
+            of a cached background instead of the whole figure
+
+        limits : string
+            how the default y limits (1D data) and color limits (2D data)
+            are chosen if they are not given:
+            - 'global': minimum and maximum of all snapshots
+            - 'snapshot': minimum and maximum of the displayed snapshot,
+              updated with every snapshot
+            - 'percentile': the percentiles given by `percentile` of all
+              snapshots, values outside are clipped
+            for logarithmic axes, the smallest positive value is used if the
+            minimum is not positive
+
+        percentile : [float, float]
+            lower and upper percentile for limits='percentile'
+
+        stats : SnapshotStats | str | True
+            per-snapshot statistics of data used for the limits. Pass the
+            `stats` attribute of another plotter of the same data to reuse
+            them, a .npz file name to read them from or store them in, or
+            True to store them next to memory-mapped data.
+
+        lod : bool
+            level of detail: if true, the GUI only shows the data at screen
+            resolution. Lines are reduced to the minimum and maximum in each
+            pixel column of the visible x range, 2D data in the modes
+            'contour' and 'mesh' is cropped to the visible region and
+            averaged over blocks of 2^k x 2^k cells. The data is refined
+            when zooming in. Saved figures and movies use the full data.
+
+        gui : bool
+            if false, no window, slider or buttons are created and the
+            plotter can only be used to save snapshots with `render`,
+            `export_frames` and `export_movie`, e.g. on headless machines
+
+        max_fps : float
+            slider events are collected until the GUI is idle and only the
+            latest snapshot is drawn. If given, the display is in addition
+            updated at most max_fps times per second while dragging.
+
+        timing_callback : callable
+            called as timing_callback(stage, seconds) whenever a stage of an
+            update or export was timed, see the `timings` attribute
+
+        show_fps : bool
+            show the latency of the last slider updates in the figure
+
+        play_fps : float
+            frame rate of the playback started with the play button
+
+        play_buffer : int
+            number of snapshots prepared ahead in a background thread during
+            the playback. Snapshots that cannot be shown in time are skipped.
+
+        ring_buffer : int
+            if given, only the last ring_buffer snapshots are kept, also
+            when more are added with `append`. They are stored in an array
+            of this size that is reused, so the memory stays bounded.
+
+        frame_cache : str
+            directory in which the frames of `render`, `export_frames` and
+            `export_movie` are cached. The frames are stored under a hash of
+            the snapshot data and all settings that change their look,
+            including the matplotlib rcParams, so exporting again only
+            renders the frames that changed.
+
+        compact : bool
+            keep a float32 copy of the data, which needs half the memory of
+            float64 data. With zlog, 2D data is stored as log10 of the values
+            (non-positive values become nan), so that contouring and color
+            mapping work on linear values, the colorbar is still labelled in
+            the units of the data. The data is read once when the plotter is
+            created, also if it is memory-mapped or a `FileSource`.
+
+        transform : callable | list of callables
+            functions applied in order to each snapshot of data as f(d, i),
+            where i is the index of the snapshot d, to show derived
+            quantities like d / d.max() or d - data[i - 1]. A snapshot is
+            only transformed when it is shown or exported, the results are
+            cached. The limits are computed from the transformed data, which
+            needs a pass over all snapshots unless ylim (1D data) or zlim
+            (2D data) are given, the zlim of 1D data is only used as floor
+            with fill. Appended snapshots are transformed when appended. See
+            `TransformedData`.
+
+        batch_transform : bool
+            if true, the transform functions are vectorized over snapshots:
+            they are called as f(block, indices) with a block of snapshots of
+            shape (n, ...) and the array of their indices. Exports then
+            transform several snapshots at once.
+
+        probe : bool | str
+            if true, clicking the axes (outside of zoom and pan mode) shows
+            the values at the clicked grid point in all snapshots in a linked
+            figure. With 'x' or 'y' (2D data), it also shows the cut through
+            the current snapshot along x or y at that point. See also
+            `time_series` and `line_cut`.
+
         **kwargs : other keywords are passed to the plotting routine
 
+        Attributes:
+        timings : Timings
+            durations of the stages of the slider updates and exports,
+            `timings.report()` returns a table of them. The stages are
+            - 'data': reading a snapshot (also in the background thread)
+            - 'contours': finding the contour polygons of a snapshot
+            - 'lines', 'snapshot', 'colorbar': updating the line data, the 2D
+              artist and the colorbar after a slider change
+            - 'draw': drawing the figure (or the changed artists)
+            - 'update': all of the above for one slider change
+            - 'render', 'rasterize', 'save', 'encode': updating the
+              off-screen figure of exports to a snapshot, drawing it into
+              the pixel buffer of a movie frame, saving and encoding it
+            - 'probe': reading the values of one grid point in all snapshots
+            stages containing other stages include their times.
+
         """
-        dpi = dpi or plt.rcParams['figure.dpi']
+        dpi = dpi or matplotlib.rcParams['figure.dpi']
+        self.timings = Timings(callback=timing_callback)
+        timed = self.timings.stage
         #
         # general setup
         #
         if y is not None:
-            if np.ndim(x) != np.ndim(y):
+            if (np.ndim(x) == 1) != (np.ndim(y) == 1):
                 raise ValueError(
                     'ERROR: x and y need to be both 1D or both 2D')
 
-            if (np.ndim(x) == 2) and (x.shape[1] != y.shape[1]):
+            if (np.ndim(x) > 1) and (x.shape[-1] != y.shape[-1]):
                 raise ValueError(
                     'ERROR: x and y need to have same number of columns')
 
         if np.ndim(x) == 1:
             nx = len(x)
         else:
-            nx = x.shape[1]
-
+            nx = x.shape[-1]
+        #
+        # 2D data can be given as (nt, ny, nx) or as (nt * ny, nx)
+        #
+        data_3D = np.ndim(data) == 3
         if y is None:
             nt = data.shape[0]
+        elif data_3D:
+            nt, ny = data.shape[:2]
         else:
             if np.ndim(y) == 1:
                 ny = len(y)
             else:
-                ny = x.shape[0]
+                ny = x.shape[-2]
             nt = data.shape[0] / ny
         #
-        # check if we have a y-axis that is time dependent
+        # check if we have a grid that is time dependent
         #
         y_of_t = False
         x_1D = x
-        if np.ndim(y) == 2 and y.shape[0] / ny == nt:
+        if np.ndim(y) == 3 or np.ndim(x) == 3 or (np.ndim(y) == 2 and y.shape[0] / ny == nt):
             y_of_t = True
-            x_1D = x[0, :]
+            x_1D = x[0, 0, :] if np.ndim(x) == 3 else x[0, :]
 
+        if ext_link is not None and getattr(ext_link, 'slider', None) is None:
+            raise ValueError(
+                'ERROR: ext_link needs a plotter with a slider, it was created with gui=False')
+        #
+        # derived data: the snapshots are transformed when they are read
+        #
+        pipeline = None
+        if transform is not None:
+            pipeline = data = TransformedData(data, transform, rows=None if y is None or data_3D else ny,
+                                   cache_size=cache_size, batch=batch_transform)
+            data_3D = y is not None
         #
         # some size checks
         #
-        if nx != data.shape[1]:
+        if nx != data.shape[-1]:
             raise ValueError(
                 'ERROR: number of x points does not match the number of columns of the data array')
         if times is not None:
@@ -176,16 +357,16 @@ class plotter:
         # color scheme
         #
         if cmap is None:
-            cmap = plt.get_cmap('viridis')
+            cmap = matplotlib.colormaps['viridis']
         #
         # convert data2 if necessary
         #
-        if type(data2).__name__ == 'ndarray':
+        if isinstance(data2, (np.ndarray, FileSource)):
             data2 = [data2]
         #
         # convert data3 if necessary
         #
-        if type(data3).__name__ == 'ndarray':
+        if isinstance(data3, np.ndarray):
             data3 = [data3]
         #
         # convert to arrays
@@ -193,44 +374,160 @@ class plotter:
         for i in np.arange(len(data3)):
             data3[i] = np.array(data3[i], ndmin=1)
         #
-        # set limits
+        # set limits, the data limits are taken from the per-snapshot
+        # statistics which are computed in one pass if they are needed
+        #
+        if limits not in ['global', 'snapshot', 'percentile']:
+            raise ValueError(
+                'ERROR: limits needs to be one of \'global\', \'snapshot\', \'percentile\'')
+        y_per_snapshot = limits == 'snapshot' and ylim is None and y is None
+        z_per_snapshot = limits == 'snapshot' and zlim is None and y is not None
+        z_clipped = limits == 'percentile' and zlim is None and y is not None
+        #
+        # for 1D data zlim is only the fill floor, which is not needed if it
+        # is not given, so the statistics are only computed for ylim
         #
+        self.stats = None
+        if (y is None and ylim is None) or (y is not None and zlim is None):
+            self.stats = get_stats(data, stats=stats, ny=None if y is None or data_3D else ny,
+                                   q=percentile if limits == 'percentile' else [])
+        i_lim = i_start if limits == 'snapshot' else None
         if xlim is None:
             xlim = [x.min(), x.max()]
         if ylim is None:
             if y is None:
-                ylim = [data.min(), data.max()]
+                ylim = self.stats.limits(i_lim, mode=limits, q=percentile, positive=ylog)
             else:
-                ylim = [y.min(), y.max()]
-        if zlim is None:
-            zlim = [data.min(), data.max()]
+                ylim = data_range(y)
+        if zlim is None and y is not None:
+            zlim = self.stats.limits(i_lim, mode=limits, q=percentile, positive=zlog)
+
+        def zlim_snapshot(i):
+            if z_per_snapshot:
+                return self.stats.limits(i, positive=zlog)
+            return zlim
+
         #
         # set logarithmic color axis
         #
-        if zlog:
-            # data=np.log10(data)
-            # zlim=np.log10(zlim)
-            norm = LogNorm()
-            if ncont is None:
-                zax = 10.**np.arange(np.ceil(np.log10(zlim[0])),
-                                     np.floor(np.log10(zlim[-1])) + 1)
-            else:
-                zax = np.logspace(np.log10(zlim[0]), np.log10(zlim[-1]), ncont)
-            if zax[0] > zlim[0]:
-                zax = np.append(zlim[0], zax)
-            if zax[-1] < zlim[-1]:
-                zax = np.append(zax, zlim[-1])
-            ncont = len(zax)
-        else:
-            norm = None
-            if ncont is None:
-                ncont = 10
-            zax = np.linspace(zlim[0], zlim[1], ncont)
+        def z_levels(zlim):
+            if zlog:
+                if ncont is None:
+                    zax = 10.**np.arange(np.ceil(np.log10(zlim[0])),
+                                         np.floor(np.log10(zlim[-1])) + 1)
+                else:
+                    zax = np.logspace(np.log10(zlim[0]), np.log10(zlim[-1]), ncont)
+                zax = zax[(zax > zlim[0]) & (zax < zlim[-1])]
+                return np.hstack((zlim[0], zax, zlim[-1]))
+            return np.linspace(zlim[0], zlim[1], ncont or 10)
+
+        def zax_snapshot(i):
+            if z_per_snapshot:
+                return z_levels(zlim_snapshot(i))
+            return zax
+
+        zax = None if zlim is None else z_levels(zlim)
         #
-        # add floor value
+        # compact storage: float32, for logarithmic 2D data the log10 of the
+        # data, then the levels and the floor are transformed the same way
         #
-        if fill:
-            data = np.maximum(data, zlim[0])
+        log_storage = compact and zlog and y is not None
+        if compact:
+            data = compact_copy(data, log=log_storage)
+
+        def to_storage(values):
+            if log_storage:
+                return np.log10(values)
+            return values
+
+        def levels_snapshot(i):
+            return to_storage(zax_snapshot(i))
+        #
+        # snapshot access: data is only read one snapshot at a time, so that
+        # memory-mapped data is never loaded completely. Snapshots are views
+        # of arrays, the floor value is only applied (as a copy) to the
+        # snapshot that is displayed, if it has values below it.
+        #
+        snapshot_cache = None
+
+        def snapshot(i):
+            if snapshot_cache is not None:
+                d = snapshot_cache.get(i)
+                if d is not None:
+                    return d
+            with timed('data'):
+                if y is None or data_3D:
+                    d = data[i]
+                else:
+                    d = data[i * ny:(i + 1) * ny]
+                if fill and zlim is not None:
+                    floor = zlim_snapshot(i)[0]
+                    if self.stats is None or self.stats.vmin[i] < floor:
+                        #
+                        # fmax also fills the nan of non-positive values
+                        # in log storage
+                        #
+                        d = (np.fmax if log_storage else np.maximum)(d, to_storage(floor))
+                #
+                # percentile limits clip the values above as well, else the
+                # contours leave them unfilled
+                #
+                if z_clipped:
+                    ceiling = zlim_snapshot(i)[1]
+                    if self.stats is None or self.stats.vmax[i] > ceiling:
+                        d = np.minimum(d, to_storage(ceiling))
+            return d
+        #
+        # the additional lines are stacked into arrays of shape (n, nt, nx)
+        # and (n, nt), so that the values of all of them are read at once
+        #
+        data2_stack = None
+        if len(data2) > 0 and all(type(d) is np.ndarray for d in data2) and \
+                len(set(d.shape for d in data2)) == 1:
+            data2_stack = np.stack(data2)
+            data2 = list(data2_stack)
+        data3_stack = None
+        if len(data3) > 0:
+            it = np.arange(int(nt))
+            data3_stack = np.array([d[np.minimum(it, len(d) - 1)] for d in data3], dtype=float)
+
+        def data2_snapshot(i):
+            if data2_stack is not None:
+                return data2_stack[:, i]
+            return [d[i] for d in data2]
+
+        def data3_snapshot(i):
+            if data3_stack is not None:
+                return data3_stack[:, i]
+            return np.array([d[min(i, len(d) - 1)] for d in data3], dtype=float)
+        #
+        # live data: data, times and the overlays are turned into sequences
+        # that can be appended to when the first snapshot is appended, or
+        # right away if only the last ring_buffer snapshots are kept
+        #
+        dropped = [0]
+        append_callbacks = []
+
+        def make_series():
+            nonlocal data, times, data2, data3, data_3D, data2_stack, data3_stack
+            if y_of_t:
+                raise ValueError(
+                    'ERROR: snapshots cannot be appended if the coordinates are time dependent')
+            data = SnapshotSeries(data, rows=None if y is None or data_3D else ny, maxlen=ring_buffer)
+            data_3D = True
+            if times is not None:
+                times = SnapshotSeries(np.asarray(times), maxlen=ring_buffer)
+            data2 = [SnapshotSeries(d, maxlen=ring_buffer) for d in data2]
+            data3 = [SnapshotSeries(d, maxlen=ring_buffer) if len(d) > 1 else d for d in data3]
+            data2_stack = data3_stack = None
+            if ring_buffer is not None and self.stats is not None:
+                self.stats = self.stats.tail(ring_buffer)
+
+        if ring_buffer is not None:
+            make_series()
+            nt = len(data)
+            i_max = nt - 1
+            i_start = min(i_start, i_max)
         #
         # set line styles
         #
@@ -243,41 +540,6 @@ class plotter:
             dummy += [lstyle[np.mod(j, len_ls0)]]
         lstyle = dummy
         #
-        # set up figure
-        #
-        fig = plt.figure(facecolor=bg_color)
-        #
-        # ===============
-        # INITIAL DRAWING
-        # ===============
-        #
-        #
-        if zlog:
-            locator = ticker.LogLocator()
-        else:
-            locator = ticker.MaxNLocator(nbins=7)
-        #
-        #
-        ax = plt.subplot(111, facecolor=bg_color_ax)
-        plt.subplots_adjust(left=0.25, bottom=0.25)
-        plt.axis([xlim[0], xlim[1], ylim[0], ylim[1]])
-        #
-        # draw labels
-        #
-        if xlabel != '':
-            plt.xlabel(xlabel)
-        if ylabel != '':
-            plt.ylabel(ylabel)
-        if times is not None:
-            ti = plt.title('{:g} {}'.format(times[i_start], timestr))
-        #
-        # set scales
-        #
-        if xlog:
-            ax.set_xscale('log')
-        if ylog:
-            ax.set_yscale('log')
-        #
         # make empty labels if none are passed
         #
         if data_label is None:
@@ -287,70 +549,496 @@ class plotter:
         if data3_label is None:
             data3_label = [''] * len(data3)
         #
-        # plot the normal data
+        # colorbar ticks
         #
-        if y is None:
+        formatter = None
+        if log_storage:
             #
-            # line data
+            # the colorbar shows log10 values, ticks at the decades are
+            # labelled like those of a logarithmic axis
             #
-            if type(lstyle[0]).__name__ == 'str':
-                l1, = ax.plot(x, data[i_start], lstyle[0],
-                              lw=lw, label=data_label)
-            else:
-                l1, = ax.plot(x, data[i_start],
-                              color=lstyle[0], lw=lw, label=data_label)
+            locator = ticker.MaxNLocator(integer=True)
+            formatter = ticker.FuncFormatter(lambda v, pos: r'$\mathdefault{10^{%d}}$' % round(v))
+        elif zlog:
+            locator = ticker.LogLocator()
         else:
+            locator = ticker.MaxNLocator(nbins=7)
+
+        def add_colorbar(mappable, target_cax):
+            cb = target_cax.figure.colorbar(mappable, cax=target_cax)
+            cb.locator = locator
+            if formatter is not None:
+                cb.formatter = formatter
+            cb.update_ticks()
+            if show_legend and data_label != '':
+                cb.set_label(data_label)
+            return cb
+        #
+        # 2D data: functions to draw a snapshot on any axes
+        #
+        ax = None
+        if y is not None:
+            if mode not in ['contour', 'image', 'mesh']:
+                raise ValueError(
+                    'ERROR: mode needs to be one of \'contour\', \'image\', \'mesh\'')
+            if mode == 'image':
+                if y_of_t or np.ndim(x) != 1 or np.ndim(y) != 1 or \
+                        not np.allclose(np.diff(x), x[1] - x[0]) or not np.allclose(np.diff(y), y[1] - y[0]):
+                    raise ValueError(
+                        'ERROR: mode=\'image\' needs evenly spaced 1D x and y, use mode=\'mesh\' instead')
+                extent = [x[0] - 0.5 * (x[1] - x[0]), x[-1] + 0.5 * (x[1] - x[0]),
+                          y[0] - 0.5 * (y[1] - y[0]), y[-1] + 0.5 * (y[1] - y[0])]
+
             #
-            # 2D data
+            # the raster modes map colors continuously between the outer
+            # levels, the contour levels are normalized by matplotlib
             #
-            if y_of_t:
-                l1 = ax.contourf(x, y[i_start * ny + np.arange(ny), :], data[i_start * ny + np.arange(
-                    ny), :], zax, cmap=cmap, norm=norm, label=data_label, **kwargs)
-                clist = l1.collections[:]
+            def norm_snapshot(i):
+                if mode == 'contour':
+                    return LogNorm() if zlog and not log_storage else None
+                levels = levels_snapshot(i)
+                if zlog and not log_storage:
+                    return LogNorm(levels[0], levels[-1])
+                return Normalize(levels[0], levels[-1])
+            #
+            # the contour polygons are cached per snapshot index and, if
+            # wanted, precomputed around the current index in a background
+            # thread
+            #
+            geometry_kwargs = {k: kwargs.pop(k) for k in ['corner_mask', 'algorithm'] if k in kwargs}
+
+            def x_snapshot(i):
+                if np.ndim(x) == 3:
+                    return x[i]
+                return x
+
+            def y_snapshot(i):
+                if np.ndim(y) == 3:
+                    return y[i]
+                if y_of_t:
+                    return y[i * ny:(i + 1) * ny]
+                return y
+
+            #
+            # level of detail of the GUI axes: block size and visible rows
+            # and columns, None means the full data
+            #
+            def grid_level_ax():
+                if not lod or mode == 'image':
+                    return None
+                bbox = ax.get_window_extent()
+                return grid_level(x_snapshot(0), y_snapshot(0), ax.get_xlim(), ax.get_ylim(),
+                                  bbox.width, bbox.height)
+
+            def grid_snapshot(i, level):
+                if level is None:
+                    return x_snapshot(i), y_snapshot(i), snapshot(i)
+                return reduce_grid(x_snapshot(i), y_snapshot(i), snapshot(i), level)
+
+            def contour_snapshot(i, level=None):
+                #
+                # the key changes when the ring buffer drops a snapshot, as
+                # all indices then refer to other snapshots
+                #
+                key = (level, dropped[0])
+                with timed('contours'):
+                    return key, contour_geometry(*grid_snapshot(i, level), levels_snapshot(i),
+                                                   logscale=zlog and not log_storage, **geometry_kwargs)
+
+            def draw_contours(target_ax, i, **extra):
+                level = gui_level[0] if target_ax is ax else None
+                geometry = None
+                if contour_cache is not None:
+                    cached = contour_cache.get(i)
+                    if cached is None or cached[0] != (level, dropped[0]):
+                        cached = contour_snapshot(i, level)
+                        contour_cache.put(i, cached)
+                    geometry = cached[1]
+                    if prefetcher is not None and target_ax is ax and not (player is not None and player.playing):
+                        prefetcher.request(i)
+                if geometry is None or sum(len(segs) for segs in geometry[0]) == 0:
+                    #
+                    # no cache, or nothing to fill (ContourSet needs polygons)
+                    #
+                    return target_ax.contourf(*grid_snapshot(i, level), levels_snapshot(i), norm=norm_snapshot(i),
+                                              cmap=cmap, **geometry_kwargs, **kwargs, **extra)
+                return ContourSet(target_ax, levels_snapshot(i), *geometry, filled=True,
+                                  norm=norm_snapshot(i), cmap=cmap, **kwargs, **extra)
+
+            def draw_raster(target_ax, i, **extra):
+                if mode == 'image':
+                    return target_ax.imshow(snapshot(i), origin='lower', extent=extent,
+                                            aspect='auto', interpolation='nearest', norm=norm_snapshot(i), cmap=cmap,
+                                            **kwargs, **extra)
+                level = gui_level[0] if target_ax is ax else None
+                return target_ax.pcolormesh(*grid_snapshot(i, level), shading='auto',
+                                            norm=norm_snapshot(i), cmap=cmap, **kwargs, **extra)
+
+            def draw_snapshot(target_ax, i, **extra):
+                if mode == 'contour':
+                    return draw_contours(target_ax, i, **extra)
+                return draw_raster(target_ax, i, **extra)
+
+            def update_snapshot(artist, i):
+                if mode == 'contour' or y_of_t or (lod and artist.axes is ax):
+                    target_ax = artist.axes
+                    artist.remove()
+                    return draw_snapshot(target_ax, i)
+                artist.set_array(snapshot(i))
+                if z_per_snapshot:
+                    artist.set_clim(levels_snapshot(i)[0], levels_snapshot(i)[-1])
+                return artist
+
+            def update_colorbar(artist, target_cax):
+                # the raster colorbar follows the limits of its artist, the
+                # contour colorbar needs to be rebuilt for the new levels
+                if z_per_snapshot and mode == 'contour':
+                    target_cax.cla()
+                    add_colorbar(artist, target_cax)
+
+            contour_cache = None
+            prefetcher = None
+            if mode == 'contour' and cache_size > 0 and 'extend' not in kwargs:
+                contour_cache = LRUCache(cache_size)
+            gui_level = [None]
+        player = None
+
+        #
+        # drawing of the data on an axes, the same code draws the GUI and
+        # the off-screen figures used for saving figures and movies
+        #
+        def draw_panel(newax, i, dynamic=None, on_replace=None):
+            """
+            draws snapshot i on the axes newax. Other axes than the GUI axes
+            follow the limits and scales of the GUI, the GUI axes show the
+            data at the level of detail. Returns a function
+            set_index(i, only_lines=False) that updates the axes to another
+            snapshot index, or with only_lines=True only redraws the lines
+            (e.g. for a new visible range).
+
+            The artists that change with the index are appended to the list
+            `dynamic` if it is given, and on_replace(old, new) is called if
+            an artist is replaced by a new one.
+            """
+            gui_axes = newax is ax
+            newax.axis([xlim[0], xlim[1], ylim[0], ylim[1]])
+            #
+            # draw labels
+            #
+            if xlabel != '':
+                newax.set_xlabel(xlabel)
+            if ylabel != '':
+                newax.set_ylabel(ylabel)
+            newti = None
+            if times is not None:
+                newti = newax.set_title('{:g} {}'.format(times[i], timestr))
+            #
+            # set scales
+            #
+            if xlog:
+                newax.set_xscale('log')
+            if ylog:
+                newax.set_yscale('log')
+            #
+            # plot the normal data
+            #
+            if y is None:
+                #
+                # line data
+                #
+                if type(lstyle[0]).__name__ == 'str':
+                    l, = newax.plot(
+                        x_1D, snapshot(i), lstyle[0], lw=lw, label=data_label)
+                else:
+                    l, = newax.plot(
+                        x_1D, snapshot(i), color=lstyle[0], lw=lw, label=data_label)
             else:
-                l1 = ax.contourf(x, y, data[i_start * ny + np.arange(ny), :],
-                                 zax, cmap=cmap, norm=norm, label=data_label, **kwargs)
-                clist = l1.collections[:]
+                #
+                # 2D data
+                #
+                if gui_axes:
+                    gui_level[0] = grid_level_ax()
+                l = draw_snapshot(newax, i, label=data_label)
+                if colbar:
+                    from mpl_toolkits.axes_grid1.axes_divider import make_axes_locatable
+                    divider = make_axes_locatable(newax)
+                    newcax = divider.append_axes("right", size="5%", pad=0.05)
+                    add_colorbar(l, newcax)
+            new_snapshot = [l]
+            #
+            # plot additional line data and vertical lines
+            #
+            new_overlays = Overlays(newax, x_1D, len(data2), lstyle[1:],
+                                    list(data2_label) + list(data3_label), lw)
+            new_overlays.set_curves(data2_snapshot(i))
+            if show_legend:
+                leg = newax.legend()
+                if leg is not None:
+                    leg.get_frame().set_facecolor(bg_color)
+                    leg.get_frame().set_edgecolor('none')
+            if dynamic is not None:
+                dynamic += [l] + new_overlays.artists + ([newti] if newti is not None else [])
+
+            #
+            # functions to set the data of the axes, the lines of the GUI
+            # are reduced to screen resolution if wanted
+            #
+            def x_pixels(xd):
+                xy = np.column_stack((xd, np.full(len(xd), newax.get_ylim()[0])))
+                return newax.transData.transform(xy)[:, 0]
+
+            def line_data(xd, yd):
+                return minmax_decimate(xd, yd, newax.get_xlim(), newax.get_window_extent().width,
+                                       to_pixels=x_pixels)
+
+            decimate = line_data if lod and gui_axes else None
+
+            def set_lines(i):
+                if y is None and decimate is None:
+                    new_snapshot[0].set_ydata(snapshot(i))
+                elif y is None:
+                    new_snapshot[0].set_data(*decimate(x_1D, snapshot(i)))
+                new_overlays.set_curves(data2_snapshot(i), decimate=decimate)
+
+            def set_limits(i):
+                if not gui_axes and ax is not None:
+                    newax.set_xlim(ax.get_xlim())
+                    newax.set_ylim(ax.get_ylim())
+                    newax.set_xscale(ax.get_xscale())
+                    newax.set_yscale(ax.get_yscale())
+                if y is None and y_per_snapshot:
+                    newax.set_ylim(self.stats.limits(i, positive=ylog))
+
+            def set_snapshot(i):
+                #
+                # unless the limits change per snapshot, levels, norm and
+                # cmap are the same for all snapshots, so the colorbar can
+                # be kept as it is
+                #
+                old_artist = new_snapshot.pop()
+                with timed('snapshot'):
+                    new_snapshot.append(update_snapshot(old_artist, i))
+                if colbar:
+                    with timed('colorbar'):
+                        update_colorbar(new_snapshot[0], newcax)
+                if on_replace is not None and new_snapshot[0] is not old_artist:
+                    on_replace(old_artist, new_snapshot[0])
+
+            def set_index(i, only_lines=False):
+                with timed('lines'):
+                    set_lines(i)
+                if only_lines:
+                    return
+                set_limits(i)
+                if y is not None:
+                    set_snapshot(i)
+                new_overlays.set_vertical(data3_snapshot(i))
+                if newti is not None:
+                    newti.set_text('{:g} {}'.format(times[i], timestr))
+
+            set_limits(i)
+            new_overlays.set_vertical(data3_snapshot(i))
+            if decimate is not None:
+                set_lines(i)
+            return set_index
+
+        def draw_offscreen(i):
+            """
+            draws snapshot i on a new figure that is not managed by pyplot.
+            Returns the figure and a function that updates it to another
+            snapshot index.
+            """
+            newfig = Figure(facecolor=bg_color, dpi=dpi)
+            FigureCanvasAgg(newfig)
+            newax = newfig.add_subplot(111, facecolor=bg_color)
+            return newfig, draw_panel(newax, i)
         #
-        # plot additional line data
+        # keys of the frame cache: hashes of everything that determines how
+        # a snapshot looks when drawn with draw_offscreen, one for each of
+        # the output formats. The hashes of the snapshot data are kept per
+        # index, until snapshots are dropped from a ring buffer, the hash of
+        # the coordinates is computed once.
         #
-        add_lines = []
-        for j, d in enumerate(data2):
-            if type(lstyle[j + 1]).__name__ == 'str':
-                l2, = ax.plot(x_1D, d[i_start, :],
-                              lstyle[j + 1], lw=lw, label=data2_label[j])
+        coords_digest = []
+        snapshot_digests = LRUCache(4096)
+
+        def snapshot_digest(i):
+            key = (i, dropped[0])
+            result = snapshot_digests.get(key)
+            if result is None:
+                items = [snapshot(i)]
+                if times is not None:
+                    items += [times[i]]
+                items += list(data2_snapshot(i)) + list(data3_snapshot(i))
+                if y is None:
+                    if y_per_snapshot:
+                        items += [self.stats.limits(i, positive=ylog)]
+                else:
+                    items += [zax_snapshot(i)]
+                    if y_of_t:
+                        items += [x_snapshot(i), y_snapshot(i)]
+                result = digest(*items)
+                snapshot_digests.put(key, result)
+            return result
+
+        def settings_digest():
+            settings = [matplotlib.__version__, rc_settings(matplotlib.rcParams), dpi,
+                        bg_color, xlim, ylim, xlog, ylog, zlog, getattr(cmap, 'name', cmap), mode,
+                        ncont, fill, lstyle, lw, xlabel, ylabel, timestr, data_label, data2_label,
+                        data3_label, colbar, show_legend, compact, sorted(kwargs.items())]
+            if y is not None:
+                settings += [sorted(geometry_kwargs.items())]
+            if ax is not None:
+                settings += [ax.get_xlim(), ax.get_ylim(), ax.get_xscale(), ax.get_yscale()]
+            if len(coords_digest) == 0:
+                coords_digest.append(digest(x if np.ndim(x) < 3 else None,
+                                            y if y is not None and not y_of_t else None))
+            return digest(settings, coords_digest[0])
+
+        def frame_keys(indices, fmts):
+            static = settings_digest()
+            keys = []
+            for i in indices:
+                key = digest(static, snapshot_digest(i))
+                keys += [[digest(fmt, key) for fmt in fmts]]
+            return keys
+
+        self._draw_panel = draw_panel
+        self._draw_offscreen = draw_offscreen
+        self._frame_keys = frame_keys
+        #
+        # everything that a forked renderer needs to be forked again for:
+        # appended or dropped snapshots and changed settings or GUI limits
+        #
+        self._frame_state = lambda: (nt, dropped[0], settings_digest())
+        self.frame_cache = None if frame_cache is None else FrameCache(frame_cache)
+
+        def append(new, t=None, new2=None, new3=None):
+            nonlocal nt
+            if not isinstance(data, SnapshotSeries):
+                make_series()
+            if times is not None and t is None:
+                raise ValueError('ERROR: the time of the new snapshot is needed')
+            if len(data2) != len(new2 or []):
+                raise ValueError('ERROR: data2 needs one new line for each of the %i data2 lines' % len(data2))
+            if any(isinstance(d, SnapshotSeries) for d in data3) and len(data3) != len(new3 or []):
+                raise ValueError('ERROR: data3 needs one new value for each of the %i data3 lines' % len(data3))
+            n_old = len(data)
+            if pipeline is not None:
+                new = pipeline.apply(np.asarray(new)[None], [n_old])[0]
+            if compact:
+                shifted = data.append(compact_copy(np.asarray(new)[None], log=log_storage)[0])
             else:
-                l2, = ax.plot(
-                    x_1D, d[i_start, :], color=lstyle[j + 1], lw=lw, label=data2_label[j])
-            add_lines += [l2]
+                shifted = data.append(new)
+            if times is not None:
+                times.append(t)
+            for d, v in zip(data2, new2 or []):
+                d.append(v)
+            for d, v in zip(data3, new3 or []):
+                if isinstance(d, SnapshotSeries):
+                    d.append(v)
+            if self.stats is not None:
+                self.stats.append(new, maxlen=ring_buffer)
+            if shifted:
+                dropped[0] += 1
+                if snapshot_cache is not None:
+                    snapshot_cache.clear()
+            nt = len(data)
+            self.nt = nt
+            if y is not None and prefetcher is not None:
+                prefetcher.n = nt
+            for callback in append_callbacks:
+                callback(n_old, shifted)
+
+        self._append = append
         #
-        # plot additional vertical lines
+        # point probes: the values of one grid point in all snapshots are
+        # read as a strided column of the data, the recent ones are cached
         #
-        add_lines2 = []
-        for j, d in enumerate(data3):
-            if type(lstyle[j + 1]).__name__ == 'str':
-                l3, = ax.plot(d[min(i_start, len(d) - 1)] * np.ones(2), ax.get_ylim(),
-                              lstyle[j + 1 + len(data2)], lw=lw, label=data3_label[j])
+        if probe not in [False, None, True, 'x', 'y']:
+            raise ValueError('ERROR: probe needs to be True, False, \'x\' or \'y\'')
+        probe_cache = LRUCache(16)
+
+        def cell_index(x0, y0, i):
+            if y is None:
+                return (int(np.argmin(np.abs(x_1D - x0))),)
+            if y0 is None:
+                raise ValueError('ERROR: 2D data needs x and y of the point')
+            xg, yg = x_snapshot(i), y_snapshot(i)
+            if np.ndim(xg) == 1:
+                return (int(np.argmin(np.abs(yg - y0))), int(np.argmin(np.abs(xg - x0))))
+            return tuple(int(k) for k in np.unravel_index(np.argmin((xg - x0)**2 + (yg - y0)**2), np.shape(xg)))
+
+        def probe_series(x0, y0=None, i=0):
+            index = cell_index(x0, y0, i)
+            key = (index, nt, dropped[0])
+            values = probe_cache.get(key)
+            if values is None:
+                with timed('probe'):
+                    values = time_series(data, index, rows=None if y is None or data_3D else ny)
+                    if log_storage:
+                        values = 10.**values
+                probe_cache.put(key, values)
+            return index, values
+
+        def line_cut(i, index, axis):
+            if y is None:
+                raise ValueError('ERROR: line cuts need 2D data')
+            if axis not in ['x', 'y']:
+                raise ValueError('ERROR: axis needs to be \'x\' or \'y\'')
+            iy, ix = index
+            d = snapshot(i)
+            xg, yg = x_snapshot(i), y_snapshot(i)
+            if axis == 'x':
+                coords, values = (xg if np.ndim(xg) == 1 else xg[iy]), d[iy]
             else:
-                l3, = ax.plot(d[min(i_start, len(d) - 1)] * np.ones(2), ax.get_ylim(),
-                              color=lstyle[j + 1 + len(data2)], lw=lw, label=data3_label[j])
-            add_lines2 += [l3]
-        if show_legend:
-            leg = ax.legend()
-            if leg is not None:
-                leg.get_frame().set_facecolor(bg_color)
-                leg.get_frame().set_edgecolor('none')
-        #
-        # add colorbar
-        #
-        if colbar:
-            divider = make_axes_locatable(ax)
-            cax = divider.append_axes("right", size="5%", pad=0.05)
-            cb = plt.colorbar(l1, cax=cax)
-            cb.locator = locator
-            cb.update_ticks()
-            if show_legend and data_label != '':
-                cb.set_label(data_label)
+                coords, values = (yg if np.ndim(yg) == 1 else yg[:, ix]), d[:, ix]
+            if log_storage:
+                values = 10.**values
+            return coords, values
+
+        self._time_series = probe_series
+        self._line_cut = lambda i, x0, y0, axis: line_cut(i, cell_index(x0, y0, i), axis)
+
+        def prepare_batch(indices):
+            if pipeline is not None and data is pipeline:
+                pipeline.prefetch(indices)
+
+        self._prepare_batch = prepare_batch
+        self._batch_size = 1 if pipeline is None else pipeline.batch_size
+        self.slider = None
+        self.nt = int(nt)
+        self._player = None
+        if not gui:
+            return
+        #
+        # pyplot (and with it the GUI backend) and the widgets are only
+        # loaded when a GUI is built
+        #
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Slider, Button
+        #
+        # set up figure
+        #
+        fig = plt.figure(facecolor=bg_color)
+        #
+        # ===============
+        # INITIAL DRAWING
+        # ===============
+        #
+        # the axes are drawn like those of the off-screen figures, the
+        # artists that change with the snapshot are redrawn when blitting
+        #
+        ax = plt.subplot(111, facecolor=bg_color_ax)
+        plt.subplots_adjust(left=0.25, bottom=0.25)
+        if y is not None and contour_cache is not None and prefetch > 0:
+            prefetcher = ContourPrefetcher(lambda i: contour_snapshot(i, gui_level[0]),
+                                           contour_cache, int(nt), radius=prefetch,
+                                           valid=lambda cached: cached[0] == (gui_level[0], dropped[0]))
+            fig.canvas.mpl_connect('close_event', lambda event: prefetcher.stop())
+        dynamic_artists = []
+        set_panel = draw_panel(ax, i_start, dynamic=dynamic_artists,
+                               on_replace=lambda old, new: blitter is not None and blitter.replace(old, new))
         #
         # ========
         # Make GUI
@@ -366,65 +1054,95 @@ class plotter:
         self.slider = slider_time
         ax._widgets = [slider_time]  # avoids garbage collection
         #
+        # latency display
+        #
+        if show_fps:
+            fps_text = fig.text(0.01, 0.01, '', fontsize='small', color='0.4')
+        #
+        # redraw only the changing artists if the backend supports it
+        #
+        blitter = None
+        if blit and getattr(fig.canvas, 'supports_blit', False) and not (y_per_snapshot or z_per_snapshot):
+            dynamic_artists += [ax_time]
+            if show_fps:
+                dynamic_artists += [fps_text]
+            blitter = BlitManager(fig.canvas, dynamic_artists)
+            slider_time.drawon = False
+        #
         # define slider update funcion
         #
 
         def update(val):
-            i = int(np.floor(slider_time.val))
-            if y is None:
-                #
-                # update line data
-                #
-                l1.set_ydata(data[i])
-            else:
-                #
-                # update 2D data
-                #
-                while len(clist) != 0:
-                    for col in clist:
-                        ax.collections.remove(col)
-                        clist.remove(col)
-                if y_of_t:
-                    dummy = ax.contourf(x, y[i * ny + np.arange(ny), :], data[i * ny + np.arange(
-                        ny), :], zax, norm=norm, cmap=cmap, **kwargs)
-                else:
-                    dummy = ax.contourf(
-                        x, y, data[i * ny + np.arange(ny), :], zax, norm=norm, cmap=cmap, **kwargs)
-                if colbar:
-                    cb = plt.colorbar(dummy, cax=cax)
-                    cb.locator = locator
-                    cb.update_ticks()
-                    if show_legend and data_label != '':
-                        cb.set_label(data_label)
-
-                for d in dummy.collections:
-                    clist.append(d)
-            #
-            # update additional lines
             #
-            for d, l2 in zip(data2, add_lines):
-                l2.set_ydata(d[i])
+            # only the latest index is drawn once the GUI is idle
             #
-            # update additional vertical lines
+            scheduler.request(int(np.floor(slider_time.val)))
             #
-            for d, l3 in zip(data3, add_lines2):
-                l3.set_xdata(d[min(i, len(d) - 1)])
-                l3.set_ydata(ax.get_ylim())
-            #
-            # update title
+            # update external plotter as well
             #
-            if times is not None:
-                ti.set_text('{:g} {}'.format(times[i], timestr))
+            if ext_link is not None:
+                ext_link.slider.set_val(slider_time.val)
+
+        def show(i):
+            if i == shown[0]:
+                #
+                # same snapshot, only the slider moved
+                #
+                if blitter is not None:
+                    blitter.update()
+                return
+            shown[0] = i
+            t_update = time.perf_counter()
             #
-            # update plot
+            # update the data, the additional lines and the title
             #
-            fig.canvas.draw()
+            set_panel(i)
+            if len(probe_view) > 0:
+                update_probe(i)
+            if show_fps:
+                recent = self.timings.recent('update', 10)
+                if len(recent) > 0:
+                    fps_text.set_text('{:.0f} ms ({:.1f} fps)'.format(1e3 * np.mean(recent), 1 / np.mean(recent)))
             #
-            # update external plotter as well
+            # update plot, the draw of draw_idle is timed when it happens
             #
-            if ext_link is not None:
-                ext_link.slider.set_val(slider_time.val)
+            if blitter is None:
+                draw_start[0] = (time.perf_counter(), t_update)
+                fig.canvas.draw_idle()
+            else:
+                with timed('draw'):
+                    blitter.update()
+                self.timings.record('update', time.perf_counter() - t_update)
+
+        def draw_callback(event):
+            if draw_start[0] is not None:
+                (t_draw, t_update), draw_start[0] = draw_start[0], None
+                self.timings.record('draw', time.perf_counter() - t_draw)
+                self.timings.record('update', time.perf_counter() - t_update)
+
+        draw_start = [None]
+        fig.canvas.mpl_connect('draw_event', draw_callback)
+        shown = [i_start]
+        scheduler = UpdateScheduler(fig.canvas, show, max_fps=max_fps)
+        fig.canvas.mpl_connect('close_event', lambda event: scheduler.stop())
         slider_time.on_changed(update)
+
+        #
+        # level of detail: refine or coarsen the data when the visible
+        # range or the size of the axes changes
+        #
+        def lod_callback(event):
+            i = shown[0]
+            if y is not None and gui_level[0] != grid_level_ax():
+                gui_level[0] = grid_level_ax()
+                set_panel(i)
+            else:
+                set_panel(i, only_lines=True)
+
+        if lod:
+            ax.callbacks.connect('xlim_changed', lod_callback)
+            ax.callbacks.connect('ylim_changed', lod_callback)
+            fig.canvas.mpl_connect('resize_event', lod_callback)
         #
         # set xlog button
         #
@@ -462,112 +1180,16 @@ class plotter:
         button_plot = Button(ax_plotbutton, 'plot',
                              color=axcolor, hovercolor='0.975')
 
-        def plotbutton_callback(event, img_name=None, img_format='.pdf'):
-            # ===================================================
-            # this part is copied from above, replacing ax=>newax
-            # and getting the snapshot index from the slider
-            # ===================================================
-            #
-            if zlog:
-                locator = ticker.LogLocator()
-            else:
-                locator = ticker.MaxNLocator(nbins=7)
+        #
+        # the off-screen figure is built on the first click and updated to
+        # the current snapshot, limits and scales on the next ones
+        #
+        plot_figure = self._renderer()
 
-            newfig = plt.figure(facecolor=bg_color)
-            newax = plt.subplot(111, facecolor=bg_color)
-            i = int(np.floor(slider_time.val))
-            plt.axis([xlim[0], xlim[1], ylim[0], ylim[1]])
-            #
-            # draw labels
-            #
-            if xlabel != '':
-                plt.xlabel(xlabel)
-            if ylabel != '':
-                plt.ylabel(ylabel)
-            if times is not None:
-                plt.title('{:g} {}'.format(times[i], timestr))
-            #
-            # set scales
-            #
-            if xlog:
-                newax.set_xscale('log')
-            if ylog:
-                newax.set_yscale('log')
-            #
-            # plot the normal data
-            #
-            if y is None:
-                #
-                # line data
-                #
-                if type(lstyle[0]).__name__ == 'str':
-                    l, = newax.plot(
-                        x_1D, data[i], lstyle[0], lw=lw, label=data_label)
-                else:
-                    l, = newax.plot(
-                        x_1D, data[i], color=lstyle[0], lw=lw, label=data_label)
-            else:
-                #
-                # 2D data
-                #
-                if y_of_t:
-                    l1 = newax.contourf(x, y[i * ny + np.arange(ny), :], data[i * ny + np.arange(
-                        ny), :], zax, norm=norm, cmap=cmap, label=data_label, **kwargs)
-                    clist = l1.collections[:] # noqa
-                else:
-                    l1 = newax.contourf(
-                        x, y, data[i * ny + np.arange(ny), :], zax, norm=norm, cmap=cmap, label=data_label, **kwargs)
-                    clist = l1.collections[:] # noqa
-                if colbar:
-                    divider = make_axes_locatable(newax)
-                    newcax = divider.append_axes("right", size="5%", pad=0.05)
-                    cb = plt.colorbar(l, cax=newcax)
-                    cb.locator = locator
-                    cb.update_ticks()
-                    if show_legend and data_label != '':
-                        cb.set_label(data_label)
-            #
-            # plot additional line data
-            #
-            add_lines = []
-            for j, d in enumerate(data2):
-                if type(lstyle[j + 1]).__name__ == 'str':
-                    l2, = newax.plot(
-                        x_1D, d[i, :], lstyle[j + 1], lw=lw, label=data2_label[j])
-                else:
-                    l2, = newax.plot(
-                        x_1D, d[i, :], color=lstyle[j + 1], lw=lw, label=data2_label[j])
-                add_lines += [l2]
-            #
-            # plot additional vertical lines
-            #
-            add_lines2 = []
-            for j, d in enumerate(data3):
-                if type(lstyle[j + 1]).__name__ == 'str':
-                    l3, = newax.plot(d[min(i, len(d) - 1)] * np.ones(2), newax.get_ylim(),
-                                     lstyle[j + 1 + len(data2)], lw=lw, label=data3_label[j])
-                else:
-                    l3, = newax.plot(d[min(i, len(d) - 1)] * np.ones(2), newax.get_ylim(),
-                                     color=lstyle[j + 1 + len(data2)], lw=lw, label=data3_label[j])
-                add_lines2 += [l3]
-            if show_legend:
-                leg = newax.legend()
-                if leg is not None:
-                    leg.get_frame().set_facecolor(bg_color)
-                    leg.get_frame().set_edgecolor('none')
-            #
-            # =========================================
-            # now set the limits as in the other figure
-            # =========================================
-            #
-            newax.set_xlim(ax.get_xlim())
-            newax.set_ylim(ax.get_ylim())
-            newax.set_xscale(ax.get_xscale())
-            newax.set_yscale(ax.get_yscale())
+        def plotbutton_callback(event, img_name=None, img_format='.pdf'):
+            newfig = plot_figure(int(np.floor(slider_time.val)))
             #
-            # =========================================
-            # now set the limits as in the other figure
-            # =========================================
+            # save the figure
             #
             if '.' not in img_format:
                 img_format = '.' + img_format
@@ -578,9 +1200,9 @@ class plotter:
                 img_name = 'figure_%03i%s' % (j, img_format)
             else:
                 img_name = img_name.replace(img_format, '') + img_format
-            plt.savefig(img_name, facecolor=bg_color, dpi=dpi)
+            with timed('save'):
+                newfig.savefig(img_name, facecolor=bg_color, dpi=dpi)
             print('saved %s' % img_name)
-            plt.close(newfig)
         button_plot.on_clicked(plotbutton_callback)
         ax._widgets += [button_plot]  # avoids garbage collection
         #
@@ -591,29 +1213,6 @@ class plotter:
                               color=axcolor, hovercolor='0.975')
 
         def moviebutton_callback(event):
-            dirname = 'movie_images_' + \
-                ''.join(choice(ascii_letters) for x in range(5))
-            img_format = '.png'
-            #
-            # create folder
-            #
-            if os.path.isdir(dirname):
-                print(
-                    'WARNING: %s folder already exists, please delete it first' % dirname)
-                return
-            else:
-                os.mkdir(dirname)
-            #
-            # save all the images
-            #
-            i0 = int(np.floor(slider_time.val))
-            for j, i in enumerate(np.arange(i0, nt)):
-                slider_time.set_val(i)
-                plotbutton_callback(
-                    None, img_name=dirname + os.sep + 'img_%03i' % j, img_format=img_format)
-            #
-            # create the movie
-            #
             moviename = 'movie.mp4'
             i_suffix = 0
             dummy = moviename
@@ -621,27 +1220,151 @@ class plotter:
                 i_suffix += 1
                 dummy = moviename.replace('.', '_%03i.' % i_suffix)
             moviename = dummy
-
-            ret = subprocess.call(['ffmpeg', '-i', dirname + os.sep + 'img_%03d' + img_format, '-c:v', 'libx264',
-                                   '-crf', '20', '-maxrate', '400k', '-pix_fmt', 'yuv420p', '-bufsize', '1835k', moviename])
-            if ret == 0:
-                #
-                # delete the images & the folder
-                #
-                for j, i in enumerate(np.arange(i0, nt)):
-                    os.remove(dirname + os.sep + 'img_%03i%s' %
-                              (j, img_format))
-                shutil.rmtree(dirname)
+            try:
+                self.export_movie(moviename)
                 print('*** Movie successfully created ***')
-            else:
-                print('WARNING: movie could not be produced, keeping images')
-            #
-            # reset slider
-            #
-            slider_time.set_val(i0)
+            except (OSError, RuntimeError) as err:
+                print('WARNING: movie could not be produced: %s' % err)
         button_movie.on_clicked(moviebutton_callback)
         ax._widgets += [button_movie]  # avoids garbage collection
         #
+        # playback: the upcoming snapshots are read (and their contours
+        # computed) in a background thread while the current one is shown
+        #
+        snapshot_cache = LRUCache(play_buffer + 2)
+
+        def prepare(i):
+            if y is not None and mode == 'contour' and contour_cache is not None:
+                cached = contour_cache.get(i)
+                if cached is None or cached[0] != (gui_level[0], dropped[0]):
+                    contour_cache.put(i, contour_snapshot(i, gui_level[0]))
+            else:
+                d = snapshot(i)
+                if type(d) is not np.ndarray:
+                    d = np.array(d)
+                snapshot_cache.put(i, d)
+
+        def play_stopped():
+            snapshot_cache.clear()
+            button_play.label.set_text('play')
+            fig.canvas.draw_idle()
+
+        player = Player(fig.canvas, prepare, slider_time.set_val, fps=play_fps, buffer=play_buffer,
+                        on_stop=play_stopped)
+        self._player = player
+        fig.canvas.mpl_connect('close_event', lambda event: player.stop())
+
+        def play_callback(event):
+            if player.playing:
+                player.stop()
+                return
+            i = int(np.floor(slider_time.val))
+            if i >= self.nt - 1:
+                i = 0
+            button_play.label.set_text('pause')
+            fig.canvas.draw_idle()
+            player.start(i, self.nt - 1)
+
+        def step_callback(n):
+            player.stop()
+            slider_time.set_val(min(max(int(np.floor(slider_time.val)) + n, 0), self.nt - 1))
+
+        ax_back = plt.axes([0.25, 0.025, 0.06, 0.04])
+        button_back = Button(ax_back, '<', color=axcolor, hovercolor='0.975')
+        button_back.on_clicked(lambda event: step_callback(-1))
+        ax_play = plt.axes([0.31, 0.025, 0.1, 0.04])
+        button_play = Button(ax_play, 'play', color=axcolor, hovercolor='0.975')
+        button_play.on_clicked(play_callback)
+        ax_forward = plt.axes([0.41, 0.025, 0.06, 0.04])
+        button_forward = Button(ax_forward, '>', color=axcolor, hovercolor='0.975')
+        button_forward.on_clicked(lambda event: step_callback(1))
+        ax._widgets += [button_back, button_play, button_forward]  # avoids garbage collection
+        self._play_callback = play_callback
+        self._step_callback = step_callback
+
+        #
+        # appended snapshots: extend the slider and follow the data if the
+        # last snapshot is shown
+        #
+        def append_callback(n_old, shifted):
+            i = int(np.floor(slider_time.val))
+            if len(probe_view) > 0:
+                show_probe(*probe_view['point'])
+            if shifted:
+                shown[0] = None
+            slider_time.valmax = self.nt - 1
+            slider_time.ax.set_xlim(slider_time.valmin, max(slider_time.valmax, 1))
+            if i == n_old - 1:
+                slider_time.set_val(self.nt - 1)
+            elif shifted:
+                slider_time.set_val(max(i - 1, 0))
+            fig.canvas.draw_idle()
+        append_callbacks.append(append_callback)
+        #
+        # point probe: a click on the axes shows the values at that point
+        # over time, and the cut through the current snapshot, in a figure
+        # that follows the slider
+        #
+        probe_view = {}
+
+        def snapshot_times():
+            if times is None:
+                return np.arange(self.nt)
+            return np.array([times[k] for k in range(self.nt)])
+
+        def show_probe(x0, y0):
+            i = shown[0] if shown[0] is not None else int(np.floor(slider_time.val))
+            index, values = probe_series(x0, y0, i)
+            if 'fig' not in probe_view:
+                pfig = plt.figure(facecolor=bg_color)
+                n_ax = 1 if probe is True or y is None else 2
+                ax_t = pfig.add_subplot(n_ax, 1, 1, facecolor=bg_color_ax)
+                ax_t.set_xlabel('snapshot' if times is None else ('time ' + timestr).strip())
+                ax_t.set_ylabel(data_label)
+                if (zlog if y is not None else ylog):
+                    ax_t.set_yscale('log')
+                series, = ax_t.plot(snapshot_times(), values, lw=lw)
+                marker = ax_t.axvline(snapshot_times()[i], color='0.5', lw=1)
+                probe_view.update(fig=pfig, ax=ax_t, series=series, marker=marker)
+                if n_ax == 2:
+                    ax_c = pfig.add_subplot(2, 1, 2, facecolor=bg_color_ax)
+                    ax_c.set_xlabel(xlabel if probe == 'x' else ylabel)
+                    ax_c.set_ylabel(data_label)
+                    ax_c.set_xscale(ax.get_xscale() if probe == 'x' else ax.get_yscale())
+                    if zlog:
+                        ax_c.set_yscale('log')
+                    ax_c.set_ylim(zlim[0], zlim[-1])
+                    cut, = ax_c.plot(*line_cut(i, index, probe), lw=lw)
+                    probe_view.update(ax_cut=ax_c, cut=cut)
+                pfig.canvas.mpl_connect('close_event', lambda event: probe_view.clear())
+            probe_view.update(point=(x0, y0), index=index)
+            probe_view['series'].set_data(snapshot_times(), values)
+            probe_view['ax'].relim()
+            probe_view['ax'].autoscale_view()
+            if y is None:
+                probe_view['ax'].set_title('x = {:g}'.format(x_1D[index[0]]))
+            elif np.ndim(x_snapshot(i)) == 1:
+                probe_view['ax'].set_title('x = {:g}, y = {:g}'.format(x_snapshot(i)[index[1]], y_snapshot(i)[index[0]]))
+            else:
+                probe_view['ax'].set_title('x = {:g}, y = {:g}'.format(x_snapshot(i)[index], y_snapshot(i)[index]))
+            probe_view['fig'].tight_layout()
+            update_probe(i)
+
+        def update_probe(i):
+            probe_view['marker'].set_xdata([snapshot_times()[i]] * 2)
+            if 'cut' in probe_view:
+                probe_view['cut'].set_data(*line_cut(i, probe_view['index'], probe))
+            probe_view['fig'].canvas.draw_idle()
+
+        def probe_callback(event):
+            if event.inaxes is not ax or event.button != 1 or getattr(fig.canvas.toolbar, 'mode', ''):
+                return
+            show_probe(event.xdata, event.ydata)
+
+        if probe:
+            fig.canvas.mpl_connect('button_press_event', probe_callback)
+        self._show_probe = show_probe
+        #
         # make ax current axes, so that it is easier to interact with
         #
         plt.axes(ax)
@@ -650,6 +1373,389 @@ class plotter:
         #
         plt.draw()
 
+    def play(self):
+        """
+        Starts or pauses the playback of the snapshots from the current one
+        to the last one, like the play button.
+        """
+        if self._player is None:
+            raise ValueError('ERROR: playback needs the GUI, create the plotter with gui=True')
+        self._play_callback(None)
+
+    def append(self, snapshot, time=None, data2=None, data3=None):
+        """
+        Adds a snapshot at the end, e.g. from a simulation that is still
+        running. The slider range is extended and, if the last snapshot was
+        shown, the new one is shown. The plot limits are not changed.
+
+        Arguments:
+        snapshot : array
+            the new snapshot, of shape (nx) for 1D or (ny, nx) for 2D data
+
+        Keywords:
+        time : float
+            time of the snapshot, needed if the plotter was given times
+        data2 : list of arrays
+            the new values of each of the data2 lines
+        data3 : list of floats
+            the new values of each of the data3 lines, ignored for the ones
+            that are constant
+        """
+        self._append(snapshot, time, data2, data3)
+
+    def line_cut(self, x0=None, y0=None, axis='x', i=None):
+        """
+        Returns a cut through a snapshot of 2D data along x at y0 (axis='x')
+        or along y at x0 (axis='y'), through the grid point closest to
+        (x0, y0).
+
+        Keywords:
+        x0, y0 : float
+            the point, only the coordinate across the cut is needed
+        axis : str
+            direction of the cut, 'x' or 'y'
+        i : int
+            snapshot index, defaults to the current one
+
+        Returns:
+        coordinates, values : arrays
+        """
+        if i is None:
+            i = 0 if self.slider is None else int(np.floor(self.slider.val))
+        return self._line_cut(i, x0 or 0.0, y0 or 0.0, axis)
+
+    def serve(self, host='127.0.0.1', port=8000, fmt='png', workers=2, prefetch=3, block=True):
+        """
+        Serves the snapshots as images over HTTP, with a page to browse
+        them at http://host:port/, see `FrameServer`.
+
+        Keywords:
+        host, port : str, int
+            address of the server, by default only reachable from this machine
+        fmt : str
+            image format
+        workers : int
+            number of processes rendering the images
+        prefetch : int
+            number of snapshots before and after the requested one that are
+            rendered in advance
+        block : bool
+            if true, serve until interrupted with Ctrl-C, else serve in a
+            background thread
+
+        Returns:
+        the FrameServer, use its `stop` method to stop it
+        """
+        from .server import FrameServer
+        server = FrameServer(self, host=host, port=port, fmt=fmt, workers=workers, prefetch=prefetch)
+        if block:
+            server.serve_forever()
+        else:
+            server.start()
+        return server
+
+    def time_series(self, x0, y0=None):
+        """
+        Returns the values of the data at the grid point closest to (x0, y0),
+        or to x0 for 1D data, in all snapshots. Only these values are read
+        (a strided read for arrays and memmaps), the result is cached.
+
+        Arguments:
+        x0, y0 : float
+            the point, y0 is only needed for 2D data
+
+        Returns:
+        index : tuple
+            index of the grid point within a snapshot
+        values : array
+            the values in all snapshots
+        """
+        i = 0 if self.slider is None else int(np.floor(self.slider.val))
+        return self._time_series(x0, y0, i)
+
+    def step(self, n=1):
+        "stops the playback and moves the slider by n snapshots"
+        if self._player is None:
+            raise ValueError('ERROR: playback needs the GUI, create the plotter with gui=True')
+        self._step_callback(n)
+
+    def _indices(self, start, stop, step):
+        "snapshot indices of an export, start defaults to the slider position"
+        if start is None:
+            start = 0 if self.slider is None else int(np.floor(self.slider.val))
+        if stop is None:
+            stop = self.nt
+        indices = range(start, stop, step)
+        if len(indices) == 0:
+            raise ValueError('ERROR: no snapshots in the range %i:%i:%i' % (start, stop, step))
+        return indices
+
+    def _chunks(self, indices, workers):
+        "split the indices into contiguous chunks, one per worker process"
+        if workers > 1 and not fork_available():
+            print('WARNING: worker processes are not available on this platform, exporting sequentially')
+            workers = 1
+        return [list(c) for c in np.array_split(np.array(indices), min(workers, len(indices)))]
+
+    def _renderer(self):
+        """
+        returns a function drawing snapshot i on an off-screen figure and
+        returning the figure. The figure is created on the first call and
+        reused for all further snapshots.
+        """
+        offscreen = []
+
+        def draw(i):
+            with self.timings.stage('render'):
+                if len(offscreen) == 0:
+                    offscreen.extend(self._draw_offscreen(i))
+                else:
+                    offscreen[1](i)
+            return offscreen[0]
+        return draw
+
+    def _cache_keys(self, indices, fmts):
+        """
+        keys of the frames in the frame cache for each index and format,
+        None if there is no cache
+        """
+        if self.frame_cache is None:
+            return [[None] * len(fmts) for i in indices]
+        return self._frame_keys(indices, fmts)
+
+    def _prepared(self, indices):
+        """
+        yields the indices, transforming the snapshots of each batch of them
+        at once before they are drawn
+        """
+        size = self._batch_size
+        for k in range(0, len(indices), size):
+            batch = list(indices[k:k + size])
+            self._prepare_batch(batch)
+            yield from batch
+
+    def _stream_frames(self, filename, indices, fps, codec, ffmpeg_args, done):
+        "render the snapshots (or take them from the cache) and pipe them into ffmpeg"
+        draw = self._renderer()
+
+        def frame(i, key):
+            if key is not None:
+                cached = self.frame_cache.get_frame(key)
+                if cached is not None:
+                    return cached
+            fig = draw(i)
+            with self.timings.stage('rasterize'):
+                fig.canvas.draw()
+            rgba = fig.canvas.buffer_rgba()
+            if key is not None:
+                self.frame_cache.put_frame(key, rgba)
+            return rgba
+
+        keys = [k[0] for k in self._cache_keys(indices, ['rgba'])]
+        first = frame(indices[0], keys[0])
+        height, width = np.asarray(first).shape[:2]
+        with FFMpegPipe(filename, (width, height), fps=fps, codec=codec, args=ffmpeg_args) as pipe:
+            for j, (i, key) in enumerate(zip(self._prepared(indices), keys)):
+                rgba = first if j == 0 else frame(i, key)
+                with self.timings.stage('encode'):
+                    pipe.write(rgba)
+                done()
+
+    def _save_frames(self, names, indices, dpis, done):
+        """
+        render the snapshots (or take them from the cache) and save each of
+        them to all its file names names[k], with the resolutions dpis. The
+        figure is updated once per snapshot for all outputs.
+        """
+        draw = self._renderer()
+        exts = [os.path.splitext(name)[1] for name in names[0]]
+        keys = self._cache_keys(indices, [ext if d is None else '%s@%g' % (ext, d) for ext, d in zip(exts, dpis)])
+        for k, i in enumerate(self._prepared(indices)):
+            fig = None
+            for name, d, key in zip(names[k], dpis, keys[k]):
+                ext = os.path.splitext(name)[1]
+                if key is None or not self.frame_cache.get_file(key, ext, name):
+                    if fig is None:
+                        fig = draw(i)
+                    with self.timings.stage('save'):
+                        fig.savefig(name, facecolor=fig.get_facecolor(), dpi=d or fig.dpi)
+                    if key is not None:
+                        self.frame_cache.put_file(key, ext, name)
+            done()
+
+    def _run(self, job, chunks, progress):
+        """
+        run job(k, chunk, done) for all chunks, in worker processes if there
+        is more than one chunk, and report the progress
+        """
+        n_total = sum(len(chunk) for chunk in chunks)
+        t0 = time.time()
+
+        def report(n_done, n_total):
+            if callable(progress):
+                progress(n_done, n_total)
+            elif progress:
+                print('\rframe {}/{} ({:.1f} frames/s)'.format(
+                    n_done, n_total, n_done / (time.time() - t0)), end='', flush=True)
+
+        if len(chunks) == 1:
+            n_done = [0]
+
+            def done():
+                n_done[0] += 1
+                report(n_done[0], n_total)
+
+            job(0, chunks[0], done)
+        else:
+            run_forked(job, chunks, progress=report)
+        if progress and not callable(progress):
+            print('')
+
+    def export_movie(self, filename='movie.mp4', start=None, stop=None, step=1, fps=10, codec='libx264',
+                     ffmpeg_args=None, workers=1, progress=True):
+        """
+        Renders the snapshots start, start + step, ... < stop on an off-screen
+        figure and streams the frames into ffmpeg, without writing any images
+        to disk.
+
+        Keywords:
+        filename : str
+            name of the movie file, overwritten if it exists
+
+        start, stop, step : int
+            range of snapshot indices, start defaults to the current slider
+            position (or 0 without GUI) and stop to the number of snapshots
+
+        fps : float
+            frames per second of the movie
+
+        codec : str
+            video codec used by ffmpeg
+
+        ffmpeg_args : list of str
+            additional output options for ffmpeg, see `FFMpegPipe`
+
+        workers : int
+            number of worker processes. Each renders and encodes a contiguous
+            part of the frames, the parts are then joined without re-encoding.
+
+        progress : bool or callable
+            if true, print the progress, if callable, it is called as
+            progress(n_done, n_total)
+
+        Returns:
+        the file name of the movie
+        """
+        chunks = self._chunks(self._indices(start, stop, step), workers)
+        if len(chunks) == 1:
+            self._run(lambda k, chunk, done: self._stream_frames(
+                filename, chunk, fps, codec, ffmpeg_args, done), chunks, progress)
+            return filename
+
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(filename))) as tmpdir:
+            parts = [os.path.join(tmpdir, 'part_%03i%s' % (k, os.path.splitext(filename)[1]))
+                     for k in range(len(chunks))]
+            self._run(lambda k, chunk, done: self._stream_frames(
+                parts[k], chunk, fps, codec, ffmpeg_args, done), chunks, progress)
+            concat_movies(parts, filename)
+        return filename
+
+    def export_frames(self, pattern='frame_{:04d}.png', start=None, stop=None, step=1, workers=1, progress=True,
+                      dpi=None):
+        """
+        Saves the snapshots start, start + step, ... < stop as separate images
+        using an off-screen figure.
+
+        Keywords:
+        pattern : str | list of str
+            file name pattern, formatted with the snapshot index. The format
+            is determined by the file extension. Several patterns save each
+            snapshot in several files, see `render`.
+
+        start, stop, step : int
+            range of snapshot indices, start defaults to the current slider
+            position (or 0 without GUI) and stop to the number of snapshots
+
+        workers : int
+            number of worker processes, each saving a contiguous part of the
+            snapshots
+
+        progress : bool or callable
+            if true, print the progress, if callable, it is called as
+            progress(n_done, n_total)
+
+        dpi : float | list of float
+            resolution of the images, or one for each pattern, defaults to
+            the dpi of the plotter
+
+        Returns:
+        list of the file names, for several patterns a list of the file
+        names of each snapshot
+        """
+        return self.render(self._indices(start, stop, step), fmt=None, out=pattern,
+                           workers=workers, progress=progress, dpi=dpi)
+
+    def render(self, indices=None, fmt='png', out='snapshot_{:04d}', workers=1, progress=False, dpi=None):
+        """
+        Saves the given snapshots to files without using the GUI. The figure
+        is drawn once on an off-screen Agg canvas, for every further snapshot
+        only the data is replaced. A snapshot can be saved in several formats
+        and resolutions, e.g. fmt=['pdf', 'png'] and dpi=[None, 300], the
+        figure is then only updated once for all of them.
+
+        Keywords:
+        indices : int | list of int
+            the snapshot indices, defaults to all snapshots
+
+        fmt : str | list of str
+            image format, or several, appended to the file names as
+            extension. If None, `out` needs to contain the extension.
+
+        out : str | list of str
+            file name pattern, formatted with the snapshot index, or one
+            pattern for each format
+
+        workers : int
+            number of worker processes, each rendering a contiguous part of
+            the snapshots
+
+        progress : bool or callable
+            if true, print the progress, if callable, it is called as
+            progress(n_done, n_total)
+
+        dpi : float | list of float
+            resolution of the images, or one for each format, defaults to
+            the dpi of the plotter
+
+        Returns:
+        list of the file names, for several formats or patterns a list of
+        the file names of each snapshot
+        """
+        if indices is None:
+            indices = range(self.nt)
+        indices = [int(i) for i in np.atleast_1d(indices)]
+        if len(indices) == 0:
+            raise ValueError('ERROR: no snapshots to render')
+        #
+        # one output for each format, pattern or resolution
+        #
+        fmts = fmt if isinstance(fmt, (list, tuple)) else [fmt]
+        outs = out if isinstance(out, (list, tuple)) else [out]
+        dpis = dpi if isinstance(dpi, (list, tuple)) else [dpi]
+        n_out = max(len(fmts), len(outs), len(dpis))
+        for name, values in [('fmt', fmts), ('out', outs), ('dpi', dpis)]:
+            if len(values) not in [1, n_out]:
+                raise ValueError('ERROR: {} needs one entry for each of the {} outputs'.format(name, n_out))
+        fmts, outs, dpis = [values * n_out if len(values) == 1 else list(values) for values in [fmts, outs, dpis]]
+        names = {i: [o.format(i) + ('' if f is None else '.' + f.lstrip('.')) for f, o in zip(fmts, outs)]
+                 for i in indices}
+        chunks = self._chunks(indices, workers)
+        self._run(lambda k, chunk, done: self._save_frames([names[i] for i in chunk], chunk, dpis, done),
+                  chunks, progress)
+        if n_out == 1:
+            return [names[i][0] for i in indices]
+        return [names[i] for i in indices]
+
 
 if __name__ == "__main__":
     main()